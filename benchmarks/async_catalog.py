@@ -0,0 +1,100 @@
+"""Load test: sync WSGI vs async ASGI catalog reads.
+
+Unlike the other benchmarks this one drives running servers over HTTP,
+so start both against the same database first, for example:
+
+    gunicorn library.wsgi -w 4 --threads 8 -b 127.0.0.1:8001
+    uvicorn library.asgi:application --workers 4 --port 8002
+
+then run
+
+    python -m benchmarks.async_catalog \\
+        --target sync=http://127.0.0.1:8001/api/library/books/ \\
+        --target async=http://127.0.0.1:8002/api/library/async/books/
+
+Each target gets the same number of concurrent connections (1000 by
+default). Pass --slow-client-ms to make every client pause before reading
+the response, which is the case where blocked worker threads hurt.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+async def run_target(url, connections, total, slow_client_ms, timeout):
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    timings = []
+    errors = 0
+    remaining = total
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    async with client.stream("GET", url) as response:
+                        if slow_client_ms:
+                            await asyncio.sleep(slow_client_ms / 1000)
+                        await response.aread()
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                timings.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(connections)))
+        elapsed = time.perf_counter() - start
+
+    timings.sort()
+    return elapsed, timings, errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        help="name=url, repeat once per server"
+    )
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--slow-client-ms", type=float, default=0)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    print(
+        f"{'target':>8} {'ok':>8} {'errors':>7} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for target in args.target:
+        name, url = target.split("=", 1)
+        elapsed, timings, errors = await run_target(
+            url, args.connections, args.requests, args.slow_client_ms, args.timeout
+        )
+        if not timings:
+            print(f"{name:>8} {0:>8} {errors:>7}")
+            continue
+        print(
+            f"{name:>8} {len(timings):>8} {errors:>7} {len(timings) / elapsed:>9.0f} "
+            f"{statistics.median(timings):>8.1f} {percentile(timings, 0.99):>8.1f} "
+            f"{timings[-1]:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
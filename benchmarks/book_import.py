@@ -0,0 +1,55 @@
+"""Throughput of the import_books pipeline.
+
+Generates a synthetic CSV catalog in memory and imports it twice: the
+first pass inserts every book, the second updates them all through the
+ON CONFLICT path.
+
+    python -m benchmarks.book_import --rows 500000
+"""
+import argparse
+import io
+import random
+
+from benchmarks.common import benchmark_database
+
+from books.importer import IMPORT_BATCH_SIZE, import_books, read_rows
+from books.models import Book
+
+
+def build_catalog(rows):
+    stream = io.StringIO()
+    stream.write("title,author,cover,inventory,daily_fee\n")
+    for number in range(rows):
+        stream.write(
+            f"Book {number},Author {number % 5000},"
+            f"{random.choice(Book.CoverChoices.values)},{random.randint(0, 20)},"
+            f"{random.randint(10, 999) / 100:.2f}\n"
+        )
+    stream.seek(0)
+    return stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.rows).getvalue()
+
+    with benchmark_database(keepdb=args.keepdb):
+        print(f"{'pass':>8} {'rows':>10} {'seconds':>8} {'rows/s':>10}")
+        for label, dry_run in (("dry-run", True), ("insert", False), ("update", False)):
+            progress = None
+            for progress in import_books(
+                read_rows(io.StringIO(catalog), "csv"),
+                batch_size=args.batch_size,
+                dry_run=dry_run
+            ):
+                pass
+            print(f"{label:>8} {progress.rows:>10} {progress.elapsed:>8.1f} {progress.rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway test database created from the
+configured one, so they never touch real data. Run them as modules from
+the project root, e.g. ``python -m benchmarks.pagination``.
+"""
+import os
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from books.models import Book  # noqa: E402
+from borrowing.models import Borrowing  # noqa: E402
+
+BATCH_SIZE = 10_000
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def measure(func, repeat=20):
+    """Run func repeatedly and return (median, p99) wall time in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return statistics.median(timings), p99
+
+
+def seed_books(rows):
+    existing = Book.objects.count()
+    for start in range(existing, rows, BATCH_SIZE):
+        Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author=f"Author {number % 5000}",
+                cover=random.choice(Book.CoverChoices.values),
+                inventory=random.randint(0, 20),
+                daily_fee=f"{random.randint(10, 999) / 100:.2f}"
+            )
+            for number in range(start, min(start + BATCH_SIZE, rows))
+        )
+
+
+def seed_users(rows):
+    User = get_user_model()
+    existing = User.objects.count()
+    User.objects.bulk_create(
+        User(email=f"reader{number}@example.com")
+        for number in range(existing, rows)
+    )
+
+
+def seed_borrowings(rows, books=1000, users=100):
+    """Fill the borrowing table up to ``rows`` rows; about 10% stay active."""
+    seed_books(books)
+    seed_users(users)
+    book_ids = list(Book.objects.values_list("id", flat=True))
+    user_ids = list(get_user_model().objects.values_list("id", flat=True))
+    today = date.today()
+    existing = Borrowing.objects.count()
+
+    for start in range(existing, rows, BATCH_SIZE):
+        batch = []
+        for _ in range(start, min(start + BATCH_SIZE, rows)):
+            borrow_date = today - timedelta(days=random.randint(0, 3650))
+            expected = borrow_date + timedelta(days=14)
+            returned = None
+            if random.random() > 0.1:
+                returned = expected + timedelta(days=random.randint(-10, 10))
+            batch.append(
+                Borrowing(
+                    borrow_date=borrow_date,
+                    expected_return_date=expected,
+                    actual_return_date=returned,
+                    book_id_id=random.choice(book_ids),
+                    user_id_id=random.choice(user_ids)
+                )
+            )
+        Borrowing.objects.bulk_create(batch)
@@ -0,0 +1,59 @@
+"""Memory and throughput of the streaming borrowing export.
+
+Seeds borrowings (10M by default) and streams the full history through
+the same generator the export endpoint uses, at growing row counts. Peak
+traced memory should stay flat while rows/s stays roughly constant.
+
+    python -m benchmarks.export --rows 10000000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import benchmark_database, seed_borrowings
+
+from borrowing.export import export_lines
+from borrowing.models import Borrowing
+from library.streaming import buffered
+
+
+def run_export(queryset, file_format):
+    tracemalloc.start()
+    start = time.perf_counter()
+    written = 0
+
+    for chunk in buffered(export_lines(queryset, file_format)):
+        written += len(chunk)
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(keepdb=args.keepdb):
+        seed_borrowings(args.rows)
+        ids = Borrowing.objects.order_by("id").values_list("id", flat=True)
+        sizes = sorted({size for size in (args.rows // 100, args.rows // 10, args.rows) if size})
+
+        print(f"{'format':>7} {'rows':>10} {'seconds':>8} {'rows/s':>10} {'peak MB':>8} {'output MB':>10}")
+        for file_format in ("csv", "ndjson"):
+            for size in sizes:
+                last_id = ids[size - 1]
+                queryset = Borrowing.objects.filter(id__lte=last_id)
+                elapsed, peak, written = run_export(queryset, file_format)
+                print(
+                    f"{file_format:>7} {size:>10} {elapsed:>8.1f} {size / elapsed:>10.0f} "
+                    f"{peak / 2 ** 20:>8.1f} {written / 2 ** 20:>10.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
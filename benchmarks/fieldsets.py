@@ -0,0 +1,85 @@
+"""Payload size and serialization time with and without ?fields=.
+
+Times the staff borrowing list and the book list at the maximum page
+size, once with every field and once per projection, and reports the
+response size. "serialize ms" covers the query and the serializer only,
+without rendering or middleware; "request ms" is the whole request.
+
+    python -m benchmarks.fieldsets --rows 100000
+"""
+import argparse
+
+from benchmarks.common import benchmark_database, measure, seed_borrowings
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from books.views import BookViewSet
+from borrowing.views import BorrowingViewSet
+
+CASES = [
+    ("borrowing", BorrowingViewSet, "/api/borrowing/borrowing/", ""),
+    ("borrowing", BorrowingViewSet, "/api/borrowing/borrowing/", "id,book_id.id,book_id.inventory"),
+    ("borrowing", BorrowingViewSet, "/api/borrowing/borrowing/", "id,expected_return_date"),
+    ("books", BookViewSet, "/api/library/books/", ""),
+    ("books", BookViewSet, "/api/library/books/", "id,inventory"),
+]
+
+
+def serialize(viewset, user, path, fields):
+    """Run get_queryset() and the list serializer like the view would."""
+    params = {"page_size": settings.API_MAX_PAGE_SIZE}
+    if fields:
+        params["fields"] = fields
+    request = Request(APIRequestFactory().get(path, params))
+
+    view = viewset(action="list", request=request, format_kwarg=None, kwargs={})
+    view.request.user = user
+    page = view.paginate_queryset(view.get_queryset())
+
+    return view.get_serializer(page, many=True).data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(keepdb=args.keepdb):
+        seed_borrowings(args.rows)
+        staff = get_user_model().objects.create_superuser(
+            email="bench-staff@example.com", password="password"
+        )
+        client = APIClient()
+        client.force_authenticate(user=staff)
+
+        print(
+            f"{'endpoint':>10} {'fields':>32} {'bytes':>8} "
+            f"{'serialize ms':>13} {'request ms':>11} {'p99':>8}"
+        )
+        for name, viewset, path, fields in CASES:
+            params = {"page_size": settings.API_MAX_PAGE_SIZE}
+            if fields:
+                params["fields"] = fields
+
+            size = len(client.get(path, params).content)
+            serialized = measure(lambda: serialize(viewset, staff, path, fields), args.repeat)
+            # Book responses are cached per URL, so vary the URL to time the
+            # build rather than the cache.
+            counter = iter(range(args.repeat))
+            requested = measure(
+                lambda: client.get(path, {**params, "_": next(counter)}),
+                args.repeat
+            )
+            print(
+                f"{name:>10} {fields or '(all)':>32} {size:>8} "
+                f"{serialized[0]:>13.2f} {requested[0]:>11.2f} {requested[1]:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Fines report cost on a large borrowing table.
+
+Seeds borrowings (5M by default) and times the staff fines endpoint per
+user and per borrowing, the totals aggregate alone, and a full NDJSON
+stream of the per-user report.
+
+    python -m benchmarks.fines --rows 5000000
+"""
+import argparse
+import time
+
+from benchmarks.common import benchmark_database, measure, seed_borrowings
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from borrowing.fines import fine_totals
+from borrowing.models import Borrowing
+
+FINES_URL = "/api/borrowing/borrowing/fines/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(keepdb=args.keepdb):
+        seed_borrowings(args.rows, users=args.users)
+        staff = get_user_model().objects.create_superuser(
+            email="bench-staff@example.com", password="password"
+        )
+        client = APIClient()
+        client.force_authenticate(user=staff)
+
+        cases = {
+            "totals aggregate": lambda: fine_totals(Borrowing.objects.all()),
+            "per-user page": lambda: client.get(FINES_URL),
+            "per-borrowing page": lambda: client.get(FINES_URL, {"group_by": "borrowing"}),
+        }
+        for label, func in cases.items():
+            median, p99 = measure(func, args.repeat)
+            print(f"{label:>20}: median {median:.1f} ms, p99 {p99:.1f} ms")
+
+        start = time.perf_counter()
+        response = client.get(FINES_URL, {"stream": "ndjson"})
+        lines = sum(chunk.count(b"\n") for chunk in response.streaming_content)
+        elapsed = time.perf_counter() - start
+        print(f"{'per-user stream':>20}: {lines} lines in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Deep-page latency of keyset pagination versus OFFSET.
+
+Seeds the borrowing table and times the staff borrowing list at growing
+depths, once through the cursor-paginated endpoint and once with the
+equivalent OFFSET query. Keyset latency should stay flat with depth.
+
+    python -m benchmarks.pagination --rows 1000000
+"""
+import argparse
+from base64 import b64encode
+from urllib.parse import urlencode
+
+from benchmarks.common import benchmark_database, measure, seed_borrowings
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from borrowing.models import Borrowing
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(position):
+    return b64encode(urlencode({"p": position}).encode("ascii")).decode("ascii")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(keepdb=args.keepdb):
+        seed_borrowings(args.rows)
+        staff = get_user_model().objects.create_superuser(
+            email="bench-staff@example.com", password="password"
+        )
+        client = APIClient()
+        client.force_authenticate(user=staff)
+        ordered = Borrowing.objects.order_by("-id")
+
+        print(f"{'depth':>10} {'keyset ms':>10} {'p99':>8} {'offset ms':>10} {'p99':>8}")
+        depths = [0, 1_000, 10_000, 100_000, args.rows // 2, args.rows - PAGE_SIZE]
+        for depth in sorted({depth for depth in depths if 0 <= depth < args.rows}):
+            url = f"/api/borrowing/borrowing/?page_size={PAGE_SIZE}"
+            if depth:
+                position = ordered.values_list("id", flat=True)[depth - 1]
+                url += f"&cursor={encode_cursor(position)}"
+
+            keyset = measure(lambda: client.get(url), args.repeat)
+            offset = measure(
+                lambda: list(ordered.select_related("book_id")[depth:depth + PAGE_SIZE]),
+                args.repeat
+            )
+            print(
+                f"{depth:>10} {keyset[0]:>10.2f} {keyset[1]:>8.2f} "
+                f"{offset[0]:>10.2f} {offset[1]:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
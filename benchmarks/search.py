@@ -0,0 +1,71 @@
+"""Catalog search versus an icontains scan.
+
+Seeds a catalog of word-salad titles and compares ?search= (full-text plus
+trigram on PostgreSQL) against the plain title/author icontains filter
+clients would otherwise need. On SQLite both sides use the icontains
+fallback, so run it against PostgreSQL for meaningful numbers.
+
+    python -m benchmarks.search --rows 1000000
+"""
+import argparse
+import random
+
+from benchmarks.common import BATCH_SIZE, benchmark_database, measure
+
+from django.db import connection
+from django.db.models import Q
+
+from books.models import Book
+from books.search import search_books
+
+WORDS = (
+    "river night garden empire shadow winter glass silent storm machine "
+    "forest ocean crown letter stone memory fire island dream city"
+).split()
+AUTHORS = ["Frank Herbert", "Ursula Le Guin", "Iain Banks", "Octavia Butler"]
+TERMS = ["shadow empire", "silnet storm", "herbert", "glass memory island"]
+
+
+def seed_catalog(rows):
+    for start in range(Book.objects.count(), rows, BATCH_SIZE):
+        Book.objects.bulk_create(
+            Book(
+                title=" ".join(random.sample(WORDS, 4)).title(),
+                author=f"{random.choice(AUTHORS)} {number % 1000}",
+                cover="HARD",
+                inventory=1,
+                daily_fee="1.00"
+            )
+            for number in range(start, min(start + BATCH_SIZE, rows))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(keepdb=args.keepdb):
+        seed_catalog(args.rows)
+        books = Book.objects.all()
+        print(f"backend: {connection.vendor}, rows: {args.rows}")
+        print(f"{'term':>22} {'search ms':>10} {'p99':>8} {'icontains ms':>13} {'p99':>8}")
+
+        for term in TERMS:
+            search = measure(lambda: list(search_books(books, term)[:50]), args.repeat)
+            scan = measure(
+                lambda: list(
+                    books.filter(Q(title__icontains=term) | Q(author__icontains=term))[:50]
+                ),
+                args.repeat
+            )
+            print(
+                f"{term:>22} {search[0]:>10.2f} {search[1]:>8.2f} "
+                f"{scan[0]:>13.2f} {scan[1]:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Microbenchmarks for list serialization and JSON rendering.
+
+For a page of books and of borrowings (with the nested book) it times
+each stage separately:
+
+- serializer: model instances through BookSerializer/BorrowingListSerializer
+- compiled: values() rows through library.fastlist.compile_rows
+- json / orjson: rendering the result with JSONRenderer / ORJSONRenderer
+
+The "fetch" variants include the query, the others work on rows already
+in memory. The script checks that both paths render to identical bytes.
+
+    python -m benchmarks.serialization --rows 500
+"""
+import argparse
+
+from benchmarks.common import benchmark_database, measure, seed_borrowings
+
+from rest_framework.renderers import JSONRenderer
+
+from books.models import Book
+from books.serializers import BookSerializer
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingListSerializer
+from library.fastlist import compile_rows
+from library.renderers import ORJSONRenderer
+
+
+def run_case(name, queryset, serializer_class, rows, repeat):
+    paths, build = compile_rows(serializer_class())
+    instances = queryset[:rows]
+    values = queryset.values(*paths)[:rows]
+
+    loaded_instances = list(instances)
+    loaded_values = list(values)
+    data = serializer_class(loaded_instances, many=True).data
+    compiled = [build(row) for row in loaded_values]
+
+    json_bytes = JSONRenderer().render(data)
+    if ORJSONRenderer().render(compiled) != json_bytes:
+        raise SystemExit(f"{name}: fast path output differs from the serializer")
+
+    timings = {
+        "serializer": measure(
+            lambda: serializer_class(loaded_instances, many=True).data, repeat
+        ),
+        "compiled": measure(lambda: [build(row) for row in loaded_values], repeat),
+        "fetch+serializer": measure(
+            lambda: serializer_class(list(instances.all()), many=True).data, repeat
+        ),
+        "fetch+compiled": measure(lambda: [build(row) for row in values.all()], repeat),
+        "json": measure(lambda: JSONRenderer().render(data), repeat),
+        "orjson": measure(lambda: ORJSONRenderer().render(data), repeat),
+    }
+
+    print(f"\n{name}: {len(loaded_instances)} rows, {len(json_bytes)} bytes")
+    print(f"{'stage':>18} {'median ms':>10} {'p99':>8} {'speedup':>8}")
+    baselines = {
+        "compiled": "serializer",
+        "fetch+compiled": "fetch+serializer",
+        "orjson": "json",
+    }
+    for stage, (median, p99) in timings.items():
+        baseline = baselines.get(stage)
+        speedup = f"{timings[baseline][0] / median:>7.1f}x" if baseline else ""
+        print(f"{stage:>18} {median:>10.2f} {p99:>8.2f} {speedup:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(keepdb=args.keepdb):
+        seed_borrowings(args.rows, books=args.rows)
+
+        run_case(
+            "books",
+            Book.objects.order_by("id"),
+            BookSerializer,
+            args.rows,
+            args.repeat
+        )
+        run_case(
+            "borrowings",
+            Borrowing.objects.select_related("book_id").order_by("-id"),
+            BorrowingListSerializer,
+            args.rows,
+            args.repeat
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Encoded size and encode/decode speed of the API's response formats.
+
+Renders a page of books and of borrowings (with the nested book) as
+JSON, orjson, MessagePack and columnar MessagePack, and times how long
+a client takes to decode each one. Sizes are shown raw and gzipped,
+since responses are usually compressed on the way out.
+
+    python -m benchmarks.wire_formats --rows 500
+"""
+import argparse
+import gzip
+import json
+
+import msgpack
+import orjson
+
+from benchmarks.common import benchmark_database, measure, seed_borrowings
+
+from rest_framework.renderers import JSONRenderer
+
+from books.models import Book
+from books.serializers import BookSerializer
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingListSerializer
+from library.renderers import (
+    ColumnarMessagePackRenderer,
+    MessagePackRenderer,
+    ORJSONRenderer,
+)
+
+FORMATS = [
+    ("json", JSONRenderer(), json.loads),
+    ("orjson", ORJSONRenderer(), orjson.loads),
+    ("msgpack", MessagePackRenderer(), msgpack.unpackb),
+    ("msgpack-columns", ColumnarMessagePackRenderer(), msgpack.unpackb),
+]
+
+
+def run_case(name, data, repeat):
+    page = {"next": None, "previous": None, "results": data}
+
+    print(f"\n{name}: {len(data)} rows")
+    print(
+        f"{'format':>16} {'bytes':>8} {'gzipped':>8} "
+        f"{'encode ms':>10} {'decode ms':>10}"
+    )
+    for label, renderer, decode in FORMATS:
+        content = renderer.render(page)
+        encoded = measure(lambda: renderer.render(page), repeat)
+        decoded = measure(lambda: decode(content), repeat)
+        print(
+            f"{label:>16} {len(content):>8} {len(gzip.compress(content)):>8} "
+            f"{encoded[0]:>10.3f} {decoded[0]:>10.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--keepdb", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(keepdb=args.keepdb):
+        seed_borrowings(args.rows, books=args.rows)
+
+        books = Book.objects.order_by("id")[:args.rows]
+        borrowings = Borrowing.objects.select_related("book_id").order_by("-id")[:args.rows]
+
+        run_case("books", BookSerializer(books, many=True).data, args.repeat)
+        run_case(
+            "borrowings",
+            BorrowingListSerializer(borrowings, many=True).data,
+            args.repeat
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Async read endpoints for the book catalog.
+
+They return the same data as the BookViewSet list and detail, through the
+same versioned response cache, but never hold a worker thread while a
+client is slow or the database is busy. Serve them from library.asgi;
+under WSGI they still work, one request per thread. Writes and search
+stay on BookViewSet.
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+
+from books.cache import (
+    CATALOG_VERSION_KEY,
+    aget_or_build,
+    aget_version,
+    book_version_key,
+    response_key,
+)
+from books.models import Book
+from books.serializers import BookSerializer
+from library.pagination import AsyncKeysetPagination
+
+
+def cached_json(data, hit):
+    return JsonResponse(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+@require_GET
+async def book_list(request):
+    version = await aget_version(CATALOG_VERSION_KEY)
+    key = response_key("async-list", version, request.build_absolute_uri())
+
+    async def build():
+        paginator = AsyncKeysetPagination()
+        books = await paginator.apaginate_queryset(Book.objects.all(), request)
+        return paginator.get_paginated_data(BookSerializer(books, many=True).data)
+
+    try:
+        data, hit = await aget_or_build(key, build)
+    except NotFound as error:
+        return JsonResponse({"detail": str(error.detail)}, status=404)
+
+    return cached_json(data, hit)
+
+
+@require_GET
+async def book_detail(request, pk):
+    version = await aget_version(book_version_key(pk))
+    key = response_key("async-retrieve", version, request.build_absolute_uri())
+
+    async def build():
+        return BookSerializer(await Book.objects.aget(pk=pk)).data
+
+    try:
+        data, hit = await aget_or_build(key, build)
+    except Book.DoesNotExist:
+        return JsonResponse({"detail": "No Book matches the given query."}, status=404)
+
+    return cached_json(data, hit)
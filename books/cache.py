@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = "books:catalog:version"
+LOCK_TIMEOUT = 5
+LOCK_POLL_INTERVAL = 0.02
+
+
+class CacheStats:
+    """In-process hit/miss counters for the book response cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+stats = CacheStats()
+
+
+def book_version_key(book_id):
+    return f"books:book:{book_id}:version"
+
+
+def get_version(key):
+    """Return the version stored under key.
+
+    Versions are the time of the last change in nanoseconds, so they never
+    repeat after an eviction and double as a Last-Modified value.
+    """
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+async def aget_version(key):
+    version = await cache.aget(key)
+
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+
+    return version
+
+
+def bump_version(key):
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_versions(book_ids):
+    """Invalidate cached responses for the given books and every list.
+
+    Versions are bumped right away and again once the surrounding
+    transaction commits, so a reader that raced the commit cannot leave a
+    stale entry under the current version.
+    """
+    keys = [book_version_key(book_id) for book_id in book_ids]
+    keys.append(CATALOG_VERSION_KEY)
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def response_key(kind, version, uri):
+    digest = hashlib.sha1(uri.encode()).hexdigest()
+    return f"books:{kind}:{version}:{digest}"
+
+
+def get_or_build(key, build):
+    """Return the cached value for key, building it on a miss.
+
+    Only one caller builds a missing entry at a time; the others wait for
+    it to appear instead of all hitting the database at once.
+    """
+    value = cache.get(key)
+    stats.record(hit=value is not None)
+
+    if value is not None:
+        return value, True
+
+    lock_key = f"{key}:lock"
+
+    acquired = cache.add(lock_key, 1, timeout=LOCK_TIMEOUT)
+
+    if not acquired:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key)
+            if value is not None:
+                return value, True
+
+    try:
+        value = build()
+        cache.set(key, value, timeout=settings.BOOK_CACHE_TIMEOUT)
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+
+    return value, False
+
+
+async def aget_or_build(key, build):
+    """Async get_or_build; build is a coroutine function.
+
+    Waiting for another builder sleeps on the event loop instead of
+    holding a thread.
+    """
+    value = await cache.aget(key)
+    stats.record(hit=value is not None)
+
+    if value is not None:
+        return value, True
+
+    lock_key = f"{key}:lock"
+
+    acquired = await cache.aadd(lock_key, 1, timeout=LOCK_TIMEOUT)
+
+    if not acquired:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            value = await cache.aget(key)
+            if value is not None:
+                return value, True
+
+    try:
+        value = await build()
+        await cache.aset(key, value, timeout=settings.BOOK_CACHE_TIMEOUT)
+    finally:
+        if acquired:
+            await cache.adelete(lock_key)
+
+    return value, False
@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Exists, Max, OuterRef
+from django.db.models.functions import Now
+from django.db.models.sql import Query
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+from books.models import Book, BookChange
+
+COMPACTION_BATCH_SIZE = 5000
+
+
+class ChangeTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = (
+        "The change feed no longer reaches back to this token, "
+        "download the catalog again"
+    )
+    default_code = "change_token_expired"
+
+
+def record_changes(book_ids, deleted=False):
+    """Append a change (or a tombstone) for each book to the feed.
+
+    Call it inside the transaction that writes the books, so the entries
+    are rolled back together with the change they describe.
+    """
+    BookChange.objects.bulk_create(
+        BookChange(book_id=book_id, deleted=deleted) for book_id in book_ids
+    )
+
+
+def database_now():
+    """Current time by the primary's clock, which stamps every entry.
+
+    Comparing entries with an app server's clock would let clock skew
+    between servers skip entries for good.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    sql, params = Query(BookChange).get_compiler(connection=connection).compile(Now())
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {sql}", params)
+        value = cursor.fetchone()[0]
+
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+
+    return value
+
+
+def make_token(seq, issued):
+    """Encode a feed position.
+
+    issued bounds the age of the entries after seq, which is what tells
+    whether compaction may have removed some of them.
+    """
+    return f"{seq}.{int(issued.timestamp())}"
+
+
+def parse_token(value):
+    try:
+        seq, issued = (int(part) for part in value.split("."))
+    except ValueError:
+        raise serializers.ValidationError({"since": "Not a change feed token"})
+
+    return seq, datetime.fromtimestamp(issued, tz=dt_timezone.utc)
+
+
+def settled_before(now):
+    return now - timedelta(seconds=settings.BOOK_CHANGE_SETTLE_SECONDS)
+
+
+def retention_horizon(now):
+    return now - timedelta(days=settings.BOOK_CHANGE_RETENTION_DAYS)
+
+
+def current_token(now=None):
+    """Token for a client about to download the full catalog."""
+    watermark = settled_before(now or database_now())
+    seq = BookChange.objects.filter(
+        created_at__lte=watermark
+    ).aggregate(seq=Max("id"))["seq"]
+
+    return make_token(seq or 0, watermark)
+
+
+def read_changes(token, limit, now=None):
+    """Return the changes after token as (changes, next_token, has_more).
+
+    Each book appears once, with its latest change; books that no longer
+    exist are reported as deleted even before their tombstone is reached.
+    Reading stops at the first entry younger than the settle window, since
+    an entry with a lower id may still be waiting for its transaction to
+    commit.
+    """
+    now = now or database_now()
+    seq, issued = parse_token(token)
+
+    if issued < retention_horizon(now):
+        raise ChangeTokenExpired()
+
+    watermark = settled_before(now)
+    settled = []
+    for change in BookChange.objects.filter(id__gt=seq).order_by("id")[:limit + 1]:
+        if change.created_at > watermark:
+            break
+        settled.append(change)
+
+    has_more = len(settled) > limit
+    settled = settled[:limit]
+
+    latest = {}
+    for change in settled:
+        latest.pop(change.book_id, None)
+        latest[change.book_id] = change
+
+    books = Book.objects.in_bulk(
+        [book_id for book_id, change in latest.items() if not change.deleted]
+    )
+    changes = [
+        {
+            "seq": change.id,
+            "id": book_id,
+            "deleted": book_id not in books,
+            "book": books.get(book_id),
+        }
+        for book_id, change in latest.items()
+    ]
+
+    if settled:
+        seq = settled[-1].id
+    issued = settled[-1].created_at if has_more else watermark
+
+    return changes, make_token(seq, issued), has_more
+
+
+def delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += BookChange.objects.filter(id__in=ids).delete()[0]
+
+
+def compact_changes(horizon_days=None, batch_size=COMPACTION_BATCH_SIZE, now=None):
+    """Drop feed entries no token can still need.
+
+    Entries older than the horizon (plus the settle window) go, tombstones
+    included, and so does every entry superseded by a later one for the
+    same book: a client reading past it gets the later one instead.
+    Returns (expired, superseded) row counts.
+    """
+    now = now or database_now()
+    if horizon_days is None:
+        horizon_days = settings.BOOK_CHANGE_RETENTION_DAYS
+    cutoff = settled_before(now - timedelta(days=horizon_days))
+
+    expired = delete_in_batches(
+        BookChange.objects.filter(created_at__lt=cutoff), batch_size
+    )
+    superseded = delete_in_batches(
+        BookChange.objects.filter(
+            Exists(BookChange.objects.filter(book_id=OuterRef("book_id"), id__gt=OuterRef("id")))
+        ),
+        batch_size
+    )
+
+    return expired, superseded
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Refuse a process-local cache outside development and tests.
+
+    Book cache versions and the per-user primary reads window live in the
+    default cache; with a cache per worker, a write only reaches the
+    worker that handled it and the others keep serving stale stock.
+    """
+    if settings.DEBUG or settings.TESTING:
+        return []
+
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+
+    return [
+        Error(
+            f"CACHE_BACKEND {backend} is not shared between worker processes.",
+            hint=(
+                "Point CACHE_BACKEND and CACHE_LOCATION at a cache every "
+                "worker uses, e.g. Redis or Memcached."
+            ),
+            id="books.E001",
+        )
+    ]
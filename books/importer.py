@@ -0,0 +1,143 @@
+import csv
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from books.cache import bump_versions
+from books.changes import record_changes
+from books.models import Book
+
+IMPORT_FORMATS = ("csv", "jsonl")
+IMPORT_FIELDS = ("title", "author", "cover", "inventory", "daily_fee")
+NATURAL_KEY = ("title", "author", "cover")
+UPDATE_FIELDS = ("inventory", "daily_fee", "updated_at")
+IMPORT_BATCH_SIZE = 5000
+
+
+class ImportProgress:
+    """Running totals of an import, reported after every batch."""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.merged = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(stream, file_format):
+    """Yield (line number, row) pairs from a CSV or JSON Lines stream.
+
+    Lines that are not valid JSON are yielded as a ValidationError so they
+    are reported like any other bad row.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as error:
+            yield line_number, ValidationError(f"Invalid JSON: {error}")
+
+
+def clean_row(row):
+    """Validate one input row with the model field rules and build a Book."""
+    if isinstance(row, ValidationError):
+        raise row
+    if not isinstance(row, dict):
+        raise ValidationError("Expected an object with book fields")
+
+    values = {}
+    errors = {}
+
+    for name in IMPORT_FIELDS:
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        try:
+            values[name] = Book._meta.get_field(name).clean(value, None)
+        except ValidationError as error:
+            errors[name] = error.messages
+
+    if errors:
+        raise ValidationError(errors)
+
+    return Book(**values)
+
+
+def upsert_books(books):
+    """Insert or update books by natural key in a single statement.
+
+    Rows sharing a natural key within the batch are merged, last one wins,
+    since one INSERT ... ON CONFLICT cannot touch the same row twice.
+    Returns the number of distinct books written.
+    """
+    unique = {}
+    for book in books:
+        unique[tuple(getattr(book, name) for name in NATURAL_KEY)] = book
+
+    with transaction.atomic():
+        saved = Book.objects.bulk_create(
+            unique.values(),
+            update_conflicts=True,
+            unique_fields=NATURAL_KEY,
+            update_fields=UPDATE_FIELDS
+        )
+        book_ids = [book.pk for book in saved if book.pk is not None]
+        bump_versions(book_ids)
+        record_changes(book_ids)
+
+    return len(unique)
+
+
+def import_books(rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False, on_error=None):
+    """Validate and upsert (line number, row) pairs in batches.
+
+    Invalid rows are passed to on_error(line_number, messages) and skipped;
+    the rest of the batch is still written. With dry_run nothing is
+    written. Yields the running ImportProgress after every batch.
+    """
+    progress = ImportProgress()
+    batch = []
+
+    def flush():
+        if dry_run:
+            progress.imported += len(batch)
+        else:
+            written = upsert_books(batch)
+            progress.imported += written
+            progress.merged += len(batch) - written
+        batch.clear()
+
+    for line_number, row in rows:
+        progress.rows += 1
+        try:
+            batch.append(clean_row(row))
+        except ValidationError as error:
+            progress.failed += 1
+            if on_error is not None:
+                on_error(line_number, error)
+
+        if progress.rows % batch_size == 0:
+            flush()
+            yield progress
+
+    if progress.rows % batch_size:
+        flush()
+        yield progress
@@ -0,0 +1,92 @@
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+from django.utils import timezone
+
+from books.cache import bump_versions
+from books.changes import record_changes
+from books.models import Book
+
+
+def take_copy(book_id):
+    """Atomically take one copy of a book off the shelf.
+
+    The decrement only applies while inventory is positive, so concurrent
+    borrowers can never oversell. Returns True if a copy was taken.
+    """
+    taken = Book.objects.filter(pk=book_id, inventory__gt=0).update(
+        inventory=F("inventory") - 1,
+        updated_at=timezone.now()
+    )
+
+    if taken:
+        bump_versions([book_id])
+        record_changes([book_id])
+
+    return bool(taken)
+
+
+def return_copy(book_id):
+    """Atomically put one copy of a book back on the shelf."""
+    Book.objects.filter(pk=book_id).update(
+        inventory=F("inventory") + 1,
+        updated_at=timezone.now()
+    )
+    bump_versions([book_id])
+    record_changes([book_id])
+
+
+class InventoryConflict(Exception):
+    """Raised when a bulk checkout lost a race for the last copies."""
+
+
+def take_copies(counts):
+    """Take several copies of several books in one UPDATE.
+
+    ``counts`` maps book id to the number of copies to take. Callers are
+    expected to have locked the rows and checked stock; the guard in the
+    WHERE clause still refuses to go below zero, and a short row count
+    raises InventoryConflict so the surrounding transaction rolls back.
+    """
+    if not counts:
+        return
+
+    in_stock = Q()
+    for book_id, count in counts.items():
+        in_stock |= Q(pk=book_id, inventory__gte=count)
+
+    taken = Book.objects.filter(in_stock).update(
+        inventory=Case(
+            *(
+                When(pk=book_id, then=F("inventory") - count)
+                for book_id, count in counts.items()
+            ),
+            default=F("inventory"),
+            output_field=PositiveIntegerField()
+        ),
+        updated_at=timezone.now()
+    )
+
+    if taken != len(counts):
+        raise InventoryConflict("Inventory changed during checkout")
+
+    bump_versions(counts.keys())
+    record_changes(counts.keys())
+
+
+def return_copies(counts):
+    """Put back several copies of several books in one UPDATE."""
+    if not counts:
+        return
+
+    Book.objects.filter(pk__in=counts.keys()).update(
+        inventory=Case(
+            *(
+                When(pk=book_id, then=F("inventory") + count)
+                for book_id, count in counts.items()
+            ),
+            default=F("inventory"),
+            output_field=PositiveIntegerField()
+        ),
+        updated_at=timezone.now()
+    )
+    bump_versions(counts.keys())
+    record_changes(counts.keys())
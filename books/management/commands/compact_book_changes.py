@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books.changes import COMPACTION_BATCH_SIZE, compact_changes
+
+
+class Command(BaseCommand):
+    """Compacts the book change feed"""
+
+    help = (
+        "Delete change feed entries that are older than the retention "
+        "horizon or superseded by a later change to the same book"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=settings.BOOK_CHANGE_RETENTION_DAYS,
+            help="Defaults to BOOK_CHANGE_RETENTION_DAYS"
+        )
+        parser.add_argument("--batch-size", type=int, default=COMPACTION_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        horizon_days = options["horizon_days"]
+
+        if horizon_days < settings.BOOK_CHANGE_RETENTION_DAYS:
+            raise CommandError(
+                "The horizon cannot be shorter than BOOK_CHANGE_RETENTION_DAYS, "
+                "the feed still accepts tokens that old"
+            )
+
+        expired, superseded = compact_changes(horizon_days, options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {expired} expired and {superseded} superseded changes"
+        ))
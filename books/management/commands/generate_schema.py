@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from library.schema import code_version, generate_schema, read_schema, write_schema
+
+
+class Command(BaseCommand):
+    """Pre-generates the OpenAPI schema served at /api/doc/"""
+
+    help = (
+        "Generate the OpenAPI schema for the current code version and save "
+        "it to OPENAPI_SCHEMA_FILE, so no request has to generate it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate even if the file matches the code version"
+        )
+
+    def handle(self, *args, **options):
+        path = settings.OPENAPI_SCHEMA_FILE
+        version = code_version()
+
+        if not options["force"] and read_schema(path, version) is not None:
+            self.stdout.write(f"Schema for {version} is up to date in {path}")
+            return
+
+        try:
+            write_schema(path, version, generate_schema())
+        except OSError as error:
+            raise CommandError(error)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote schema for {version} to {path}"))
@@ -0,0 +1,88 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.importer import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    import_books,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    """Upserts books from a CSV or JSON Lines catalog file"""
+
+    help = (
+        "Import books keyed on title, author and cover; existing books get "
+        "their inventory and daily fee updated"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read; '-' reads stdin")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Defaults to the file extension"
+        )
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate every row without writing anything"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or self.guess_format(path)
+
+        if path == "-":
+            self.run(sys.stdin, file_format, options)
+            return
+
+        try:
+            stream = open(path, newline="", encoding="utf-8")
+        except OSError as error:
+            raise CommandError(error)
+
+        with stream:
+            self.run(stream, file_format, options)
+
+    def guess_format(self, path):
+        extension = os.path.splitext(path)[1].lstrip(".").lower()
+
+        if extension == "json":
+            extension = "jsonl"
+        if extension not in IMPORT_FORMATS:
+            raise CommandError("Cannot tell the format, pass --format")
+
+        return extension
+
+    def run(self, stream, file_format, options):
+        def report_error(line_number, error):
+            messages = getattr(error, "message_dict", None) or error.messages
+            self.stderr.write(f"line {line_number}: {messages}")
+
+        progress = None
+        for progress in import_books(
+            read_rows(stream, file_format),
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+            on_error=report_error
+        ):
+            self.stderr.write(
+                f"{progress.rows} rows, {progress.failed} errors, "
+                f"{progress.rate:.0f} rows/s"
+            )
+
+        if progress is None:
+            self.stdout.write("Nothing to import")
+            return
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {progress.imported} books from {progress.rows} rows "
+            f"({progress.merged} duplicates merged, {progress.failed} errors) "
+            f"in {progress.elapsed:.1f}s"
+        ))
@@ -1,21 +1,54 @@
-import time
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db.utils import OperationalError
-from django.db import connections
+
+from library.db import pools, wait_for_database, warm_pools
 
 
 class Command(BaseCommand):
-    """Waits for the database to be available"""
+    """Waits for the database to be available and warms the connection pool"""
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Give up (and exit non-zero) after this many seconds"
+        )
+        parser.add_argument("--initial-delay", type=float, default=0.5)
+        parser.add_argument("--max-delay", type=float, default=10)
+        parser.add_argument(
+            "--no-warm",
+            action="store_true",
+            help="Only check the database, do not fill the connection pool"
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
-            try:
-                db_conn = connections["default"]
-                db_conn.cursor()
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
+
+        def report_retry(error, delay):
+            self.stdout.write(
+                f"Database unavailable ({str(error).strip()}), "
+                f"retrying in {delay:.1f}s..."
+            )
+
+        try:
+            wait_for_database(
+                options["database"],
+                timeout=options["timeout"],
+                initial_delay=options["initial_delay"],
+                max_delay=options["max_delay"],
+                on_retry=report_retry
+            )
+        except OperationalError as error:
+            raise CommandError(f"Database still unavailable: {error}")
 
         self.stdout.write(self.style.SUCCESS("Database available!"))
+
+        if options["no_warm"] or not any(pools()):
+            return
+
+        for alias, stats in warm_pools(timeout=options["timeout"]).items():
+            self.stdout.write(
+                f"Pool '{alias}' ready with {stats.get('pool_size', 0)} connections"
+            )
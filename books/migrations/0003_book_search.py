@@ -0,0 +1,52 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# The search vector is a PostgreSQL generated column that Django never
+# reads or writes directly; books.search queries it through RawSQL. On other
+# databases (SQLite test runs) none of this exists and search falls back
+# to icontains.
+FORWARD_SQL = [
+    """
+    ALTER TABLE books_book ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(author, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX book_search_vector_idx ON books_book USING gin (search_vector)",
+    "CREATE INDEX book_title_trgm_idx ON books_book USING gin (title gin_trgm_ops)",
+    "CREATE INDEX book_author_trgm_idx ON books_book USING gin (author gin_trgm_ops)",
+]
+
+BACKWARD_SQL = [
+    "DROP INDEX IF EXISTS book_author_trgm_idx",
+    "DROP INDEX IF EXISTS book_title_trgm_idx",
+    "DROP INDEX IF EXISTS book_search_vector_idx",
+    "ALTER TABLE books_book DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_book_updated_at"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(
+            run_on_postgresql(FORWARD_SQL),
+            run_on_postgresql(BACKWARD_SQL),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.2 on 2026-10-18 16:20
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_books(apps, schema_editor):
+    """Fold books sharing title, author and cover into the oldest of them.
+
+    The kept book gets the summed inventory and the borrowings of the
+    others, so the unique constraint below can be added to existing data.
+    """
+    alias = schema_editor.connection.alias
+    Book = apps.get_model("books", "Book")
+    Borrowing = apps.get_model("borrowing", "Borrowing")
+
+    duplicates = (
+        Book.objects.using(alias)
+        .values("title", "author", "cover")
+        .annotate(count=Count("id"), keep=Min("id"), inventory=Sum("inventory"))
+        .filter(count__gt=1)
+    )
+
+    for group in duplicates:
+        others = Book.objects.using(alias).filter(
+            title=group["title"], author=group["author"], cover=group["cover"]
+        ).exclude(pk=group["keep"])
+
+        Borrowing.objects.using(alias).filter(book_id__in=others).update(book_id=group["keep"])
+        Book.objects.using(alias).filter(pk=group["keep"]).update(inventory=group["inventory"])
+        others.delete()
+
+    if schema_editor.connection.vendor == "postgresql":
+        # Run the deferred foreign key checks now: PostgreSQL refuses to
+        # alter a table with pending trigger events in the transaction.
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_search"),
+        ("borrowing", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_books, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="book",
+            constraint=models.UniqueConstraint(
+                fields=("title", "author", "cover"), name="book_natural_key"
+            ),
+        ),
+    ]
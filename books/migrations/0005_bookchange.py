@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_natural_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookChange",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("book_id", models.BigIntegerField()),
+                ("deleted", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["book_id", "id"], name="book_change_book_seq")
+                ],
+            },
+        ),
+    ]
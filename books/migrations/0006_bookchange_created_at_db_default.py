@@ -0,0 +1,21 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:54
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0005_bookchange"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="bookchange",
+            name="created_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(), db_index=True
+            ),
+        ),
+    ]
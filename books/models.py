@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Now
 
 
 class Book(models.Model):
@@ -11,6 +12,15 @@ class Book(models.Model):
     cover = models.CharField(max_length=150, choices=CoverChoices.choices)
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=5, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["title", "author", "cover"],
+                name="book_natural_key"
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -19,3 +29,27 @@ class Book(models.Model):
             f"Inventory: {self.inventory}; "
             f"Daily Fee: {self.daily_fee}"
             )
+
+
+class BookChange(models.Model):
+    """One entry of the book change feed.
+
+    The id is the feed sequence. book_id is a plain integer rather than a
+    foreign key so tombstones (deleted=True) outlive the book they record.
+    created_at comes from the database clock, the only one all app servers
+    share.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    book_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(db_default=Now(), db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["book_id", "id"], name="book_change_book_seq"),
+        ]
+
+    def __str__(self):
+        action = "deleted" if self.deleted else "changed"
+        return f"#{self.id}: book {self.book_id} {action}"
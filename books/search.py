@@ -0,0 +1,69 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+from rest_framework.filters import BaseFilterBackend
+
+from books.models import Book
+
+SEARCH_PARAM = "search"
+
+
+def search_books(queryset, term):
+    """Filter books matching term, best matches first.
+
+    On PostgreSQL this combines the stored full-text vector over title and
+    author with trigram similarity, so misspelt queries still match. Other
+    databases fall back to a case-insensitive substring scan.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.filter(
+            Q(title__icontains=term) | Q(author__icontains=term)
+        ).order_by("id")
+
+    query = SearchQuery(term, config="english", search_type="websearch")
+    vector = RawSQL(
+        f'"{Book._meta.db_table}"."search_vector"',
+        [],
+        output_field=SearchVectorField()
+    )
+
+    return (
+        queryset.alias(
+            search_vector=vector,
+            rank=SearchRank(vector, query),
+            similarity=Greatest(
+                TrigramSimilarity("title", term),
+                TrigramSimilarity("author", term)
+            )
+        )
+        .filter(
+            Q(search_vector=query)
+            | Q(title__trigram_similar=term)
+            | Q(author__trigram_similar=term)
+        )
+        .order_by("-rank", "-similarity", "id")
+    )
+
+
+class BookSearchFilter(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(SEARCH_PARAM, "").strip()
+
+        if not term:
+            return queryset
+
+        return search_books(queryset, term)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": SEARCH_PARAM,
+                "required": False,
+                "in": "query",
+                "description": "Search books by title or author",
+                "schema": {"type": "string"},
+            },
+        ]
@@ -1,14 +1,31 @@
 from rest_framework import serializers
 from books.models import Book
+from library.fieldsets import FieldsetSerializerMixin
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = (
+            "id",
             "title",
             "author",
             "cover",
             "inventory",
             "daily_fee"
         )
+
+
+class BookChangeSerializer(serializers.Serializer):
+    seq = serializers.IntegerField()
+    id = serializers.IntegerField()
+    deleted = serializers.BooleanField()
+    book = BookSerializer(allow_null=True)
+
+
+class BookChangeFeedSerializer(serializers.Serializer):
+    next = serializers.CharField(
+        help_text="Token to pass as since on the next request"
+    )
+    has_more = serializers.BooleanField()
+    changes = BookChangeSerializer(many=True)
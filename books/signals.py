@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from books.cache import bump_versions
+from books.changes import record_changes
+from books.models import Book
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_book_cache(sender, instance, **kwargs):
+    bump_versions([instance.pk])
+
+
+@receiver(post_save, sender=Book)
+def record_book_saved(sender, instance, **kwargs):
+    record_changes([instance.pk])
+
+
+@receiver(post_delete, sender=Book)
+def record_book_deleted(sender, instance, **kwargs):
+    record_changes([instance.pk], deleted=True)
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from books.models import Book
+
+
+class AsyncCatalogTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = AsyncClient()
+        self.books = [
+            Book.objects.create(title=f"Book {number}", author="Author", cover="HARD", inventory=1, daily_fee=1.00)
+            for number in range(5)
+        ]
+        self.list_url = reverse("books:async-books-list")
+
+    async def test_list_pages_forward_and_back(self):
+        first = await self.client.get(self.list_url, {"page_size": 2})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([book["title"] for book in first.json()["results"]], ["Book 0", "Book 1"])
+        self.assertIsNone(first.json()["previous"])
+
+        second = await self.client.get(first.json()["next"])
+        self.assertEqual([book["title"] for book in second.json()["results"]], ["Book 2", "Book 3"])
+
+        back = await self.client.get(second.json()["previous"])
+        self.assertEqual([book["title"] for book in back.json()["results"]], ["Book 0", "Book 1"])
+
+        last = await self.client.get(second.json()["next"])
+        self.assertEqual([book["title"] for book in last.json()["results"]], ["Book 4"])
+        self.assertIsNone(last.json()["next"])
+
+    async def test_list_matches_sync_endpoint(self):
+        async_page = (await self.client.get(self.list_url)).json()
+        sync_page = (await self.client.get(reverse("books:books-list"))).json()
+
+        self.assertEqual(async_page["results"], sync_page["results"])
+
+    async def test_cursor_from_sync_endpoint_is_accepted(self):
+        sync_page = (await self.client.get(reverse("books:books-list"), {"page_size": 2})).json()
+        cursor = sync_page["next"].split("cursor=")[1].split("&")[0]
+
+        response = await self.client.get(self.list_url, {"page_size": 2, "cursor": cursor})
+
+        self.assertEqual([book["title"] for book in response.json()["results"]], ["Book 2", "Book 3"])
+
+    async def test_invalid_cursor(self):
+        response = await self.client.get(self.list_url, {"cursor": "garbage"})
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_detail_is_cached_until_the_book_changes(self):
+        url = reverse("books:async-books-detail", args=[self.books[0].id])
+
+        first = await self.client.get(url)
+        second = await self.client.get(url)
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(second.json()["title"], "Book 0")
+
+        self.books[0].title = "Renamed"
+        await self.books[0].asave()
+
+        third = await self.client.get(url)
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertEqual(third.json()["title"], "Renamed")
+
+    async def test_detail_not_found(self):
+        response = await self.client.get(reverse("books:async-books-detail", args=[0]))
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_writes_are_rejected(self):
+        response = await self.client.post(self.list_url, {})
+
+        self.assertEqual(response.status_code, 405)
+
+    @override_settings(SLOW_QUERY_MS=0)
+    async def test_requests_are_measured(self):
+        labels = {"method": "GET", "view": "books:async-books-list"}
+        before = REGISTRY.get_sample_value("http_request_db_queries_count", labels) or 0
+
+        await self.client.get(self.list_url)
+
+        self.assertEqual(REGISTRY.get_sample_value("http_request_db_queries_count", labels), before + 1)
+        self.assertGreater(REGISTRY.get_sample_value("http_request_db_queries_sum", labels), 0)
@@ -1,4 +1,13 @@
-from django.test import TestCase
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from books import cache as book_cache
+from books.checks import check_shared_cache
+from books.inventory import take_copy
 from books.models import Book
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
@@ -6,6 +15,7 @@ from django.contrib.auth import get_user_model
 from books.serializers import BookSerializer
 from rest_framework.test import APIRequestFactory
 from books.permissions import IsAdminOrReadOnly
+from library.testing import QueryBudgetMixin
 
 
 class BookModelTest(TestCase):
@@ -46,7 +56,7 @@ class BookSerializerTest(APITestCase):
     def test_serializer_contains_correct_fields(self):
         serializer = BookSerializer(instance=self.book)
         data = serializer.data
-        self.assertEqual(set(data.keys()), {"title", "author", "cover", "inventory", "daily_fee"})
+        self.assertEqual(set(data.keys()), {"id", "title", "author", "cover", "inventory", "daily_fee"})
 
     def test_serializer_data(self):
         serializer = BookSerializer(instance=self.book)
@@ -82,6 +92,7 @@ class IsAdminOrReadOnlyTest(TestCase):
 
 class BookViewSetTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.admin_user = get_user_model().objects.create_superuser(email="adminuser@example.com", password="password")
         self.book = Book.objects.create(
@@ -97,6 +108,15 @@ class BookViewSetTest(APITestCase):
         response = self.client.get(self.book_url)
         self.assertEqual(response.status_code, 200)
 
+    def test_list_books_is_cursor_paginated(self):
+        Book.objects.create(title="Second Book", author="API Author", cover="SOFT", inventory=1, daily_fee=1.00)
+        response = self.client.get(self.book_url, {"page_size": 1})
+        self.assertEqual([book["title"] for book in response.data["results"]], ["API Book"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([book["title"] for book in response.data["results"]], ["Second Book"])
+        self.assertIsNone(response.data["next"])
+
     def test_create_book_as_admin(self):
         self.client.force_authenticate(user=self.admin_user)
         data = {
@@ -121,3 +141,169 @@ class BookViewSetTest(APITestCase):
         }
         response = self.client.post(self.book_url, data)
         self.assertEqual(response.status_code, 403)
+
+
+class BookQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Book.objects.bulk_create(
+            Book(title=f"Book {number}", author="Author", cover="SOFT", inventory=1, daily_fee=1.00)
+            for number in range(30)
+        )
+
+    def test_list_books_query_budget(self):
+        response = self.assertQueryBudget(1, "get", reverse("books:books-list"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve_book_query_budget(self):
+        book = Book.objects.first()
+        response = self.assertQueryBudget(1, "get", reverse("books:books-detail", args=[book.id]))
+        self.assertEqual(response.status_code, 200)
+
+
+class BookCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="Cached Book", author="Author", cover="HARD", inventory=2, daily_fee=1.00
+        )
+        self.list_url = reverse("books:books-list")
+        self.detail_url = reverse("books:books-detail", args=[self.book.id])
+
+    def test_second_read_is_served_from_cache(self):
+        self.assertEqual(self.client.get(self.list_url)["X-Cache"], "MISS")
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(context), 0)
+        self.assertEqual(response.data["results"][0]["title"], "Cached Book")
+
+    def test_saving_book_invalidates_list_and_detail(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+
+        self.book.title = "Renamed Book"
+        self.book.save()
+
+        self.assertEqual(self.client.get(self.list_url).data["results"][0]["title"], "Renamed Book")
+        self.assertEqual(self.client.get(self.detail_url).data["title"], "Renamed Book")
+
+    def test_inventory_change_invalidates_detail(self):
+        self.assertEqual(self.client.get(self.detail_url).data["inventory"], 2)
+
+        take_copy(self.book.id)
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["inventory"], 1)
+
+    def test_unnormalized_pk_shares_the_book_version(self):
+        url = f"{self.list_url}0{self.book.id}/"
+        self.assertEqual(self.client.get(url).data["inventory"], 2)
+
+        take_copy(self.book.id)
+
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["inventory"], 1)
+        self.assertEqual(self.client.get(f"{self.list_url}x1/").status_code, 404)
+
+    def test_stats_count_hits_and_misses(self):
+        hits, misses = book_cache.stats.hits, book_cache.stats.misses
+
+        self.client.get(self.detail_url)
+        self.client.get(self.detail_url)
+
+        self.assertEqual(book_cache.stats.hits - hits, 1)
+        self.assertEqual(book_cache.stats.misses - misses, 1)
+
+    def test_concurrent_misses_build_once(self):
+        builds = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.1)
+            return {"value": 1}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(book_cache.get_or_build("books:test", build)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual([value for value, _ in results], [{"value": 1}] * 10)
+
+    def test_process_local_cache_is_refused_in_production(self):
+        with override_settings(DEBUG=False, TESTING=False):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ["books.E001"])
+
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(DEBUG=False, TESTING=False, CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class BookConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="Polled Book", author="Author", cover="HARD", inventory=2, daily_fee=1.00
+        )
+        self.list_url = reverse("books:books-list")
+
+    def test_matching_etag_returns_not_modified_without_queries(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(context), 0)
+
+    def test_inventory_change_changes_etag(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        take_copy(self.book.id)
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.list_url)["Last-Modified"]
+
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+
+class BookSearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Book.objects.create(title="The Hobbit", author="J. R. R. Tolkien", cover="HARD", inventory=1, daily_fee=1.00)
+        Book.objects.create(title="Dune", author="Frank Herbert", cover="SOFT", inventory=1, daily_fee=1.00)
+        Book.objects.create(title="Children of Dune", author="Frank Herbert", cover="SOFT", inventory=1, daily_fee=1.00)
+        self.book_url = reverse("books:books-list")
+
+    def test_search_by_title(self):
+        response = self.client.get(self.book_url, {"search": "hobbit"})
+        self.assertEqual([book["title"] for book in response.data["results"]], ["The Hobbit"])
+
+    def test_search_by_author(self):
+        response = self.client.get(self.book_url, {"search": "herbert"})
+        self.assertEqual(response.data["count"], 2)
+
+    def test_search_results_use_limit_pagination(self):
+        response = self.client.get(self.book_url, {"search": "dune", "limit": 1})
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNotNone(response.data["next"])
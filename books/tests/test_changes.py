@@ -0,0 +1,158 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+
+from books.changes import database_now, make_token, record_changes
+from books.importer import upsert_books
+from books.models import Book, BookChange
+
+CHANGES_URL = reverse("books:books-changes")
+
+
+@override_settings(BOOK_CHANGE_SETTLE_SECONDS=0, BOOK_CHANGE_RETENTION_DAYS=30)
+class BookChangeFeedTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="kiosk@example.com", password="password")
+        self.token = self.client.get(CHANGES_URL).data["next"]
+
+    def create_book(self, title="Synced Book", inventory=2):
+        return Book.objects.create(
+            title=title, author="Author", cover="HARD", inventory=inventory, daily_fee="1.50"
+        )
+
+    def sync(self, token=None, **params):
+        response = self.client.get(CHANGES_URL, {"since": token or self.token, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_bootstrap_token_skips_earlier_changes(self):
+        self.create_book()
+        token = self.client.get(CHANGES_URL).data["next"]
+
+        self.assertEqual(self.sync(token)["changes"], [])
+
+    def test_latest_state_and_tombstones(self):
+        kept = self.create_book("Kept")
+        gone = self.create_book("Gone")
+        kept.inventory = 7
+        kept.save()
+        gone_id = gone.id
+        gone.delete()
+
+        feed = self.sync()
+
+        self.assertEqual(
+            [(change["id"], change["deleted"]) for change in feed["changes"]],
+            [(kept.id, False), (gone_id, True)]
+        )
+        self.assertEqual(feed["changes"][0]["book"]["inventory"], 7)
+        self.assertIsNone(feed["changes"][1]["book"])
+        self.assertEqual(self.sync(feed["next"])["changes"], [])
+
+    def test_borrow_and_return_are_recorded(self):
+        book = self.create_book()
+        self.token = self.sync()["next"]
+        self.client.force_authenticate(user=self.user)
+        today = timezone.now().date()
+
+        response = self.client.post(reverse("borrowing:borrowing-list"), {
+            "book_id": book.id,
+            "borrow_date": today,
+            "expected_return_date": today + timezone.timedelta(days=7),
+        })
+        self.assertEqual(response.status_code, 201)
+
+        feed = self.sync()
+        self.assertEqual(feed["changes"][0]["book"]["inventory"], 1)
+
+        response = self.client.get(
+            reverse("borrowing:borrowing-return-borrowing", args=[response.data["id"]]),
+            {"actual_return_date": today}
+        )
+        self.assertEqual(response.status_code, 201)
+
+        feed = self.sync(feed["next"])
+        self.assertEqual(feed["changes"][0]["book"]["inventory"], 2)
+
+    def test_imports_are_recorded(self):
+        upsert_books([
+            Book(title="Imported", author="Author", cover="SOFT", inventory=1, daily_fee="2.00")
+        ])
+
+        self.assertEqual(self.sync()["changes"][0]["book"]["title"], "Imported")
+
+    def test_pages_follow_the_sequence(self):
+        books = [self.create_book(f"Book {number}") for number in range(3)]
+
+        first = self.sync(limit=2)
+        second = self.sync(first["next"], limit=2)
+
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            [change["id"] for change in first["changes"] + second["changes"]],
+            [book.id for book in books]
+        )
+
+    def test_unsettled_changes_wait(self):
+        first = self.create_book("First")
+        self.create_book("Second")
+        BookChange.objects.filter(book_id=first.id).update(
+            created_at=timezone.now() + timezone.timedelta(minutes=1)
+        )
+
+        feed = self.sync()
+
+        self.assertEqual(feed["changes"], [])
+        self.assertEqual(feed["next"].split(".")[0], self.token.split(".")[0])
+
+    def test_entries_are_stamped_by_the_database_clock(self):
+        skewed = timezone.now() + timezone.timedelta(hours=1)
+
+        with mock.patch("django.utils.timezone.now", return_value=skewed):
+            record_changes([1])
+
+        stamped = BookChange.objects.get(book_id=1).created_at
+        self.assertLess(abs(database_now() - stamped), timezone.timedelta(minutes=1))
+
+    def test_expired_and_malformed_tokens(self):
+        old = make_token(0, timezone.now() - timezone.timedelta(days=31))
+
+        self.assertEqual(self.client.get(CHANGES_URL, {"since": old}).status_code, 410)
+        self.assertEqual(self.client.get(CHANGES_URL, {"since": "latest"}).status_code, 400)
+        self.assertEqual(
+            self.client.get(CHANGES_URL, {"since": self.token, "limit": 0}).status_code, 400
+        )
+
+    def test_compaction_keeps_valid_tokens_working(self):
+        book = self.create_book()
+        for inventory in (3, 4):
+            book.inventory = inventory
+            book.save()
+        stale = self.create_book("Stale")
+        BookChange.objects.filter(book_id=stale.id).update(
+            created_at=timezone.now() - timezone.timedelta(days=40)
+        )
+        stdout = StringIO()
+
+        call_command("compact_book_changes", stdout=stdout)
+
+        self.assertIn("Deleted 1 expired and 2 superseded changes", stdout.getvalue())
+        self.assertEqual(
+            list(BookChange.objects.values_list("book_id", flat=True)), [book.id]
+        )
+        feed = self.sync()
+        self.assertEqual([change["id"] for change in feed["changes"]], [book.id])
+        self.assertEqual(feed["changes"][0]["book"]["inventory"], 4)
+
+    def test_compaction_horizon_cannot_undercut_retention(self):
+        with self.assertRaises(CommandError):
+            call_command("compact_book_changes", "--horizon-days", "7")
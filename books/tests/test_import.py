@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from books.cache import CATALOG_VERSION_KEY, get_version
+from books.models import Book
+
+CSV_HEADER = "title,author,cover,inventory,daily_fee\n"
+
+
+class ImportBooksCommandTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_books", path, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv_creates_books(self):
+        path = self.write_file("catalog.csv", CSV_HEADER + "Dune,Frank Herbert,SOFT,3,1.50\nEmma,Jane Austen,HARD,1,0.75\n")
+
+        stdout, _ = self.run_import(path)
+
+        self.assertIn("Imported 2 books from 2 rows", stdout)
+        dune = Book.objects.get(title="Dune")
+        self.assertEqual(dune.inventory, 3)
+        self.assertEqual(dune.daily_fee, Decimal("1.50"))
+
+    def test_import_updates_existing_books_by_natural_key(self):
+        book = Book.objects.create(title="Dune", author="Frank Herbert", cover="SOFT", inventory=1, daily_fee=1.00)
+        version = get_version(CATALOG_VERSION_KEY)
+        path = self.write_file("catalog.csv", CSV_HEADER + "Dune,Frank Herbert,SOFT,9,2.00\nDune,Frank Herbert,HARD,4,3.00\n")
+
+        self.run_import(path)
+
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 9)
+        self.assertEqual(book.daily_fee, Decimal("2.00"))
+        self.assertEqual(Book.objects.filter(title="Dune").count(), 2)
+        self.assertNotEqual(get_version(CATALOG_VERSION_KEY), version)
+
+    def test_duplicates_in_one_batch_are_merged(self):
+        path = self.write_file("catalog.csv", CSV_HEADER + "Dune,Frank Herbert,SOFT,1,1.00\nDune,Frank Herbert,SOFT,5,1.00\n")
+
+        stdout, _ = self.run_import(path)
+
+        self.assertIn("1 duplicates merged", stdout)
+        self.assertEqual(Book.objects.get().inventory, 5)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        path = self.write_file(
+            "catalog.csv",
+            CSV_HEADER + "Dune,Frank Herbert,PAPER,1,1.00\nEmma,Jane Austen,HARD,-1,abc\nIt,Stephen King,HARD,2,1.00\n"
+        )
+
+        stdout, stderr = self.run_import(path)
+
+        self.assertIn("line 2: {'cover'", stderr)
+        self.assertIn("line 3: {'inventory'", stderr)
+        self.assertIn("daily_fee", stderr)
+        self.assertIn("2 errors", stdout)
+        self.assertEqual(list(Book.objects.values_list("title", flat=True)), ["It"])
+
+    def test_import_jsonl_in_batches(self):
+        lines = [
+            json.dumps({"title": f"Book {number}", "author": "Author", "cover": "HARD", "inventory": number, "daily_fee": "1.00"})
+            for number in range(5)
+        ]
+        lines.insert(2, "{not json")
+        path = self.write_file("catalog.jsonl", "\n".join(lines) + "\n")
+
+        stdout, stderr = self.run_import(path, "--batch-size", "2")
+
+        self.assertIn("line 3: ['Invalid JSON", stderr)
+        self.assertEqual(stderr.count("rows/s"), 3)
+        self.assertIn("Imported 5 books from 6 rows", stdout)
+        self.assertEqual(Book.objects.count(), 5)
+
+    def test_dry_run_writes_nothing(self):
+        path = self.write_file("catalog.csv", CSV_HEADER + "Dune,Frank Herbert,SOFT,3,1.50\nEmma,,HARD,1,0.75\n")
+
+        stdout, stderr = self.run_import(path, "--dry-run")
+
+        self.assertIn("Validated 1 books from 2 rows", stdout)
+        self.assertIn("line 3: {'author'", stderr)
+        self.assertFalse(Book.objects.exists())
+
+    def test_unknown_format_is_rejected(self):
+        path = self.write_file("catalog.txt", CSV_HEADER)
+
+        with self.assertRaises(CommandError):
+            self.run_import(path)
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase, APIClient
+
+from books.models import Book
+
+BOOK_LIST_LABELS = {"method": "GET", "view": "books:books-list"}
+SCRAPER = {"HTTP_AUTHORIZATION": "Bearer scrape-token"}
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_TOKEN="scrape-token")
+class MetricsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="reader@example.com", password="password")
+        Book.objects.create(title="Metered Book", author="Author", cover="HARD", inventory=1, daily_fee=1.00)
+        self.client.force_authenticate(user=self.user)
+
+    def test_request_is_recorded_per_view(self):
+        requests = sample("http_request_duration_seconds_count", status="200", **BOOK_LIST_LABELS)
+        queries = sample("http_request_db_queries_sum", **BOOK_LIST_LABELS)
+        size = sample("http_response_size_bytes_sum", **BOOK_LIST_LABELS)
+
+        response = self.client.get(reverse("books:books-list"))
+
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", status="200", **BOOK_LIST_LABELS),
+            requests + 1
+        )
+        self.assertGreater(sample("http_request_db_queries_sum", **BOOK_LIST_LABELS), queries)
+        self.assertGreater(sample("http_request_db_duration_seconds_count", **BOOK_LIST_LABELS), 0)
+        self.assertEqual(
+            sample("http_response_size_bytes_sum", **BOOK_LIST_LABELS),
+            size + len(response.content)
+        )
+
+    def test_unmatched_paths_share_one_label(self):
+        before = sample("http_request_duration_seconds_count", method="GET", view="unmatched", status="404")
+
+        self.client.get("/no/such/page/")
+        self.client.get("/another/missing/page/")
+
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", method="GET", view="unmatched", status="404"),
+            before + 2
+        )
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("books:books-list"))
+
+        response = self.client.get(reverse("metrics"), **SCRAPER)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(b'http_request_duration_seconds_bucket{le="0.005",method="GET"', response.content)
+        self.assertIn(b"telegram_messages_total", response.content)
+
+    def test_metrics_need_the_token_or_staff(self):
+        url = reverse("metrics")
+
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(
+            self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong").status_code, 403
+        )
+        self.client.force_login(get_user_model().objects.create_superuser(
+            email="admin@example.com", password="password"
+        ))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_empty_token_is_never_accepted(self):
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class FakePool:
+    def get_stats(self):
+        return {"pool_size": 5, "pool_available": 2, "requests_waiting": 1, "requests_num": 40, "requests_wait_ms": 1500}
+
+
+@override_settings(METRICS_TOKEN="scrape-token")
+class PoolMetricsTest(APITestCase):
+    @mock.patch("library.metrics.pools", return_value=[("default", FakePool())])
+    def test_pool_stats_are_exported(self, pools):
+        response = self.client.get(reverse("metrics"), **SCRAPER)
+
+        self.assertIn(b'db_pool_connections{database="default",state="in_use"} 3.0', response.content)
+        self.assertIn(b'db_pool_connections{database="default",state="idle"} 2.0', response.content)
+        self.assertIn(b'db_pool_requests_waiting{database="default"} 1.0', response.content)
+        self.assertIn(b'db_pool_wait_seconds_total{database="default"} 1.5', response.content)
+        self.assertIn(b'db_pool_errors_total{database="default"} 0.0', response.content)
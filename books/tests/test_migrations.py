@@ -0,0 +1,46 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MergeDuplicateBooksMigrationTest(TransactionTestCase):
+    def migrate(self, books_migration=None):
+        """Migrate every app to its latest state, and books to books_migration."""
+        executor = MigrationExecutor(connection)
+        targets = [
+            ("books", books_migration) if app == "books" and books_migration else (app, name)
+            for app, name in executor.loader.graph.leaf_nodes()
+        ]
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate()
+
+    def test_duplicates_are_merged_before_the_constraint(self):
+        apps = self.migrate("0003_book_search")
+        Book = apps.get_model("books", "Book")
+        Borrowing = apps.get_model("borrowing", "Borrowing")
+        User = apps.get_model("user", "User")
+
+        user = User.objects.create(email="user@example.com", password="password")
+        kept, duplicate = (
+            Book.objects.create(title="Dune", author="Herbert", cover="HARD", inventory=inventory, daily_fee=1)
+            for inventory in (2, 3)
+        )
+        other = Book.objects.create(title="Dune", author="Herbert", cover="SOFT", inventory=1, daily_fee=1)
+        borrowing = Borrowing.objects.create(
+            borrow_date="2024-01-01", expected_return_date="2024-01-08", book_id=duplicate, user_id=user
+        )
+
+        apps = self.migrate("0004_book_natural_key")
+        Book = apps.get_model("books", "Book")
+
+        self.assertEqual(
+            sorted(Book.objects.values_list("id", "inventory")),
+            [(kept.id, 5), (other.id, 1)]
+        )
+        self.assertEqual(
+            apps.get_model("borrowing", "Borrowing").objects.get(pk=borrowing.pk).book_id_id,
+            kept.id
+        )
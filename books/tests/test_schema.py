@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import yaml
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from library import schema
+from library.schema import code_version, read_schema, schema_cache, write_schema
+
+JSON_MEDIA_TYPE = "application/vnd.oai.openapi+json"
+
+
+class CachedSchemaTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "openapi-schema.json")
+
+        overrides = override_settings(OPENAPI_SCHEMA_FILE=self.path, CODE_VERSION="v1")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        for reset in (code_version.cache_clear, schema_cache.clear):
+            reset()
+            self.addCleanup(reset)
+
+        self.generate = mock.patch.object(
+            schema, "generate_schema", wraps=schema.generate_schema
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def get_schema(self, **headers):
+        return self.client.get(reverse("schema"), headers=headers)
+
+    def test_schema_is_generated_once_and_saved(self):
+        first = self.get_schema()
+        second = self.get_schema()
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(self.generate.call_count, 1)
+        self.assertIn("/api/library/books/", yaml.safe_load(first.content)["paths"])
+        self.assertIsNotNone(read_schema(self.path, "v1"))
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.get_schema()["ETag"]
+
+        response = self.get_schema(**{"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_formats_are_rendered_from_the_same_schema(self):
+        yaml_response = self.get_schema()
+        json_response = self.get_schema(Accept=JSON_MEDIA_TYPE)
+
+        self.assertEqual(json_response["Content-Type"], JSON_MEDIA_TYPE)
+        self.assertNotEqual(yaml_response["ETag"], json_response["ETag"])
+        self.assertEqual(
+            json.loads(json_response.content),
+            yaml.safe_load(yaml_response.content)
+        )
+        self.assertEqual(self.generate.call_count, 1)
+
+    def test_saved_schema_is_used_without_generating(self):
+        write_schema(self.path, "v1", b'{"openapi": "3.0.3", "paths": {}}')
+
+        response = self.get_schema(Accept=JSON_MEDIA_TYPE)
+
+        self.assertEqual(json.loads(response.content), {"openapi": "3.0.3", "paths": {}})
+        self.generate.assert_not_called()
+
+    def test_schema_of_another_version_is_regenerated(self):
+        write_schema(self.path, "v0", b'{"openapi": "3.0.3", "paths": {}}')
+
+        response = self.get_schema(Accept=JSON_MEDIA_TYPE)
+
+        self.assertIn("/api/library/books/", json.loads(response.content)["paths"])
+        self.generate.assert_called_once()
+        self.assertIsNone(read_schema(self.path, "v0"))
+
+    def test_docs_pages_load_the_cached_schema(self):
+        for name in ("swagger-ui", "redoc"):
+            response = self.client.get(reverse(name))
+            self.assertContains(response, reverse("schema"))
+
+    def test_command_skips_an_up_to_date_schema(self):
+        out = StringIO()
+
+        call_command("generate_schema", stdout=out)
+        call_command("generate_schema", stdout=out)
+        call_command("generate_schema", "--force", stdout=out)
+
+        self.assertEqual(self.generate.call_count, 2)
+        self.assertIn("up to date", out.getvalue())
+        self.get_schema()
+        self.assertEqual(self.generate.call_count, 2)
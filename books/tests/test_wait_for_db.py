@@ -0,0 +1,81 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+from library import db
+from library.db import wait_for_database, warm_pools_once
+
+
+class FakeCursor:
+    def __init__(self, failures):
+        self.failures = failures
+
+    def __enter__(self):
+        if self.failures:
+            self.failures.pop()
+            raise OperationalError("connection refused")
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql):
+        pass
+
+
+class WaitForDbTest(SimpleTestCase):
+    def patch_cursor(self, failures):
+        failures = ["refused"] * failures
+        patcher = mock.patch.object(connections["default"], "cursor", side_effect=lambda: FakeCursor(failures))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("library.db.time.sleep")
+    def test_backs_off_exponentially(self, sleep):
+        self.patch_cursor(failures=4)
+
+        wait_for_database(initial_delay=0.5, max_delay=3)
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [0.5, 1, 2, 3])
+
+    @mock.patch("library.db.time.sleep")
+    def test_command_reports_retries(self, sleep):
+        self.patch_cursor(failures=2)
+        out = StringIO()
+
+        call_command("wait_for_db", stdout=out)
+
+        self.assertEqual(out.getvalue().count("retrying in"), 2)
+        self.assertIn("Database available!", out.getvalue())
+
+    @mock.patch("library.db.time.sleep")
+    @mock.patch("library.db.time.monotonic", side_effect=[0, 1, 5, 61])
+    def test_command_fails_after_timeout(self, monotonic, sleep):
+        self.patch_cursor(failures=10)
+
+        with self.assertRaises(CommandError):
+            call_command("wait_for_db", "--timeout", "60", stdout=StringIO())
+
+        self.assertEqual(sleep.call_count, 2)
+
+
+class WarmPoolsOnceTest(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(db, "_warmed_pid", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch("library.db.warm_pools_on_startup")
+    def test_pools_are_warmed_once_per_process(self, warm):
+        warm_pools_once()
+        warm_pools_once()
+        self.assertEqual(warm.call_count, 1)
+
+        with mock.patch("library.db.os.getpid", return_value=-1):
+            warm_pools_once()
+        self.assertEqual(warm.call_count, 2)
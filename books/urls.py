@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from books import async_views
 from books.views import BookViewSet
 
 app_name = "books"
@@ -9,4 +10,12 @@ router = routers.DefaultRouter()
 
 router.register("books", BookViewSet, basename="books")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path("async/books/", async_views.book_list, name="async-books-list"),
+    path(
+        "async/books/<int:pk>/",
+        async_views.book_detail,
+        name="async-books-detail"
+    ),
+]
@@ -1,12 +1,149 @@
-from rest_framework import viewsets
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.http import Http404
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
 
+from books.cache import (
+    CATALOG_VERSION_KEY,
+    book_version_key,
+    get_or_build,
+    get_version,
+    response_key,
+)
+from books.changes import current_token, read_changes
 from books.models import Book
-from books.serializers import BookSerializer
+from books.serializers import BookSerializer, BookChangeFeedSerializer
 from books.permissions import IsAdminOrReadOnly
+from books.search import SEARCH_PARAM, BookSearchFilter
+from library.conditional import ConditionalGetMixin
+from library.fastlist import FastListMixin
+from library.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetMixin
+from library.pagination import RankedPagination
+from library.routers import use_primary
+
+
+class CachedCatalogMixin:
+    """Serve list and retrieve from the versioned book response cache.
+
+    Misses are built from the primary even when the request reads from a
+    replica: an entry built from a lagging replica would be stored under
+    the new version and outlive the lag.
+    """
+
+    def get_version_key(self):
+        if self.action == "retrieve":
+            try:
+                book_id = int(self.kwargs["pk"])
+            except ValueError:
+                raise Http404
+            return book_version_key(book_id)
+
+        return CATALOG_VERSION_KEY
+
+    def cached_response(self, build):
+        key = response_key(
+            self.action,
+            get_version(self.get_version_key()),
+            self.request.build_absolute_uri()
+        )
+        def fill():
+            with use_primary():
+                return build().data
+
+        data, hit = get_or_build(key, fill)
+
+        return Response(data, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+    def list(self, request, *args, **kwargs):
+        build = super().list
+        return self.cached_response(lambda: build(request, *args, **kwargs))
 
+    def retrieve(self, request, *args, **kwargs):
+        build = super().retrieve
+        return self.cached_response(lambda: build(request, *args, **kwargs))
 
-class BookViewSet(viewsets.ModelViewSet):
+
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class BookViewSet(
+    ConditionalGetMixin,
+    CachedCatalogMixin,
+    SparseFieldsetMixin,
+    FastListMixin,
+    viewsets.ModelViewSet
+):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAdminOrReadOnly]
+    filter_backends = [BookSearchFilter]
+    read_from_replica = ("list", "retrieve")
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.request.query_params.get(SEARCH_PARAM):
+                self._paginator = RankedPagination()
+            else:
+                self._paginator = self.pagination_class()
+
+        return self._paginator
+
+    def get_queryset(self):
+        return self.project_queryset(super().get_queryset())
+
+    def get_modification_state(self):
+        version = get_version(self.get_version_key())
+        last_modified = datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+
+        return str(version), last_modified
+
+    @extend_schema(
+        description=(
+            "Books created, updated or deleted since a token, each with its "
+            "latest state. Without since, returns the token to start from "
+            "before downloading the full catalog. Answers 410 once the token "
+            "is older than the feed's retention; download the catalog again."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                description="Token from a previous response",
+                required=False,
+                type=str
+            ),
+            OpenApiParameter(
+                name="limit",
+                description="Maximum number of feed entries to read",
+                required=False,
+                type=int
+            ),
+        ],
+        responses=BookChangeFeedSerializer,
+    )
+    @action(methods=["GET"], detail=False, filter_backends=[], pagination_class=None)
+    def changes(self, request):
+        since = request.query_params.get("since")
+        limit_field = serializers.IntegerField(min_value=1, max_value=settings.API_MAX_PAGE_SIZE)
+
+        try:
+            limit = limit_field.run_validation(
+                request.query_params.get("limit", settings.API_MAX_PAGE_SIZE)
+            )
+        except serializers.ValidationError as error:
+            raise serializers.ValidationError({"limit": error.detail})
+
+        if since is None:
+            changes, token, has_more = [], current_token(), False
+        else:
+            changes, token, has_more = read_changes(since, limit)
+
+        return Response(BookChangeFeedSerializer(
+            {"next": token, "has_more": has_more, "changes": changes}
+        ).data)
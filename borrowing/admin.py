@@ -1,8 +1,14 @@
 from django.contrib import admin
 
-from borrowing.models import Borrowing
+from borrowing.models import Borrowing, Notification
 
 
 @admin.register(Borrowing)
 class BorrowingAdmin(admin.ModelAdmin):
-    pass
+    list_select_related = ("book_id", "user_id")
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
@@ -0,0 +1,43 @@
+from django.db.models import F
+
+from library.streaming import STREAM_CHUNK_SIZE, csv_lines, ndjson_lines
+
+EXPORT_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book_id",
+    "book_title",
+    "user_id",
+    "user_email",
+)
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+
+def export_rows(queryset, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield borrowings as plain dicts, fetched chunk by chunk in id order."""
+    return (
+        queryset.order_by("id")
+        .values(
+            "id",
+            "borrow_date",
+            "expected_return_date",
+            "actual_return_date",
+            "book_id",
+            "user_id",
+            book_title=F("book_id__title"),
+            user_email=F("user_id__email")
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def export_lines(queryset, file_format, chunk_size=STREAM_CHUNK_SIZE):
+    rows = export_rows(queryset, chunk_size)
+
+    if file_format == "csv":
+        return csv_lines(rows, EXPORT_FIELDS)
+
+    return ndjson_lines(rows)
@@ -0,0 +1,42 @@
+from django.utils.dateparse import parse_date
+from rest_framework import serializers
+
+DATE_RANGE_FILTERS = (
+    ("borrowed_after", "borrow_date__gte"),
+    ("borrowed_before", "borrow_date__lte"),
+)
+
+
+def filter_borrowings(queryset, params):
+    """Apply the is_active and borrow date range filters.
+
+    ``params`` is any mapping of raw string values, e.g. request query
+    params or management command options.
+    """
+    is_active = params.get("is_active")
+
+    if is_active is not None:
+        if is_active.lower() == "true":
+            queryset = queryset.filter(actual_return_date__isnull=True)
+        elif is_active.lower() == "false":
+            queryset = queryset.filter(actual_return_date__isnull=False)
+
+    for param, lookup in DATE_RANGE_FILTERS:
+        value = params.get(param)
+
+        if not value:
+            continue
+
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+
+        if date is None:
+            raise serializers.ValidationError(
+                {param: "Enter a valid date in YYYY-MM-DD format"}
+            )
+
+        queryset = queryset.filter(**{lookup: date})
+
+    return queryset
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Func,
+    IntegerField,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+FINE_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+class DaysBetween(Func):
+    """Whole days from start to end, computed in the database."""
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="CAST(JULIANDAY(%(expressions)s) AS INTEGER)",
+            arg_joiner=") - JULIANDAY(",
+            **extra_context
+        )
+
+
+def overdue_filter(today):
+    """Borrowings returned late, or still out past the expected date."""
+    return Q(actual_return_date__gt=F("expected_return_date")) | Q(
+        actual_return_date__isnull=True,
+        expected_return_date__lt=today
+    )
+
+
+def with_fines(queryset, today=None):
+    """Annotate days_overdue and fine (daily_fee x days, as Decimal).
+
+    Active borrowings accrue fines up to ``today``. Only overdue rows are
+    kept, so the WHERE clause can use the overdue index.
+    """
+    today = today or timezone.now().date()
+    days_overdue = Greatest(
+        DaysBetween(
+            Coalesce("actual_return_date", Value(today)),
+            F("expected_return_date")
+        ),
+        Value(0)
+    )
+
+    return queryset.filter(overdue_filter(today)).annotate(
+        days_overdue=days_overdue,
+        fine=ExpressionWrapper(
+            F("days_overdue") * F("book_id__daily_fee"),
+            output_field=FINE_FIELD
+        )
+    )
+
+
+def fines_by_borrowing(queryset, today=None):
+    return with_fines(queryset, today).values(
+        "id",
+        "user_id",
+        "book_id",
+        "expected_return_date",
+        "actual_return_date",
+        "days_overdue",
+        "fine",
+    )
+
+
+def fines_by_user(queryset, today=None):
+    return (
+        with_fines(queryset, today)
+        .values("user_id")
+        .annotate(
+            overdue_borrowings=Count("id"),
+            total_fine=Sum("fine", output_field=FINE_FIELD)
+        )
+        .order_by("user_id")
+    )
+
+
+def fine_totals(queryset, today=None):
+    return with_fines(queryset, today).aggregate(
+        total_fine=Coalesce(
+            Sum("fine", output_field=FINE_FIELD),
+            Value(Decimal("0.00")),
+            output_field=FINE_FIELD
+        ),
+        overdue_borrowings=Count("id"),
+        users=Count("user_id", distinct=True)
+    )
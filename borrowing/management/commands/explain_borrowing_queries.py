@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+
+from borrowing.models import Borrowing
+
+
+class Command(BaseCommand):
+    """Runs EXPLAIN on the main borrowing queries and reports index usage"""
+
+    help = "Show query plans for BorrowingViewSet and overdue queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user-id",
+            type=int,
+            help="User to filter by (defaults to the first borrower)"
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Execute the queries (EXPLAIN ANALYZE, PostgreSQL only)"
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the full plan for every query"
+        )
+
+    def get_queries(self, user_id):
+        today = timezone.now().date()
+        borrowings = Borrowing.objects.order_by("-id")
+
+        return {
+            "user history": borrowings.filter(user_id=user_id),
+            "user active": borrowings.filter(
+                user_id=user_id, actual_return_date__isnull=True
+            ),
+            "user returned": borrowings.filter(
+                user_id=user_id, actual_return_date__isnull=False
+            ),
+            "all active": borrowings.filter(actual_return_date__isnull=True),
+            "overdue": Borrowing.objects.filter(
+                actual_return_date__isnull=True,
+                expected_return_date__lt=today
+            ).order_by("expected_return_date"),
+        }
+
+    def handle(self, *args, **options):
+        user_id = options["user_id"]
+        if user_id is None:
+            user_id = Borrowing.objects.aggregate(user_id=Min("user_id"))["user_id"]
+
+        index_names = [index.name for index in Borrowing._meta.indexes]
+        explain_options = {"analyze": True} if options["analyze"] else {}
+
+        for label, queryset in self.get_queries(user_id).items():
+            plan = queryset[:50].explain(**explain_options)
+            used = [name for name in index_names if name in plan]
+
+            if used:
+                self.stdout.write(
+                    self.style.SUCCESS(f"{label}: uses {', '.join(used)}")
+                )
+            elif "index" in plan.lower():
+                self.stdout.write(f"{label}: uses a default index")
+            else:
+                self.stdout.write(self.style.WARNING(f"{label}: no index used"))
+
+            if options["verbose_plans"]:
+                self.stdout.write(plan)
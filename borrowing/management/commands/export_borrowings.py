@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from borrowing.export import EXPORT_FORMATS, export_lines
+from borrowing.filters import filter_borrowings
+from borrowing.models import Borrowing
+from library.streaming import STREAM_CHUNK_SIZE, buffered
+
+
+class Command(BaseCommand):
+    """Streams the borrowing history to a CSV or NDJSON file"""
+
+    help = "Export borrowings row by row with constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write to; '-' (default) writes to stdout"
+        )
+        parser.add_argument("--user-id", type=int)
+        parser.add_argument("--is-active", choices=("true", "false"))
+        parser.add_argument("--borrowed-after", help="YYYY-MM-DD")
+        parser.add_argument("--borrowed-before", help="YYYY-MM-DD")
+        parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Borrowing.objects.all()
+
+        if options["user_id"]:
+            queryset = queryset.filter(user_id=options["user_id"])
+
+        try:
+            queryset = filter_borrowings(queryset, options)
+        except serializers.ValidationError as error:
+            raise CommandError(error.detail)
+
+        lines = buffered(
+            export_lines(queryset, options["format"], options["chunk_size"])
+        )
+
+        if options["output"] == "-":
+            for chunk in lines:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as output:
+            for chunk in lines:
+                output.write(chunk)
+
+        self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}"))
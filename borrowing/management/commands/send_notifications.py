@@ -0,0 +1,51 @@
+import time
+from django.core.management.base import BaseCommand
+
+from borrowing.outbox import deliver_batch
+from telegram_bot import TelegramSender
+
+
+class Command(BaseCommand):
+    """Drains the notification outbox through a single Telegram session"""
+
+    help = "Deliver queued Telegram notifications from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the outbox is empty"
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as there is nothing left to send"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        delivered = 0
+
+        self.stdout.write("Starting notification worker...")
+
+        try:
+            with TelegramSender(concurrency=options["concurrency"]) as sender:
+                while True:
+                    processed = deliver_batch(sender, batch_size)
+                    delivered += processed
+
+                    if processed:
+                        continue
+                    if options["once"]:
+                        break
+
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Interrupted, stopping worker.")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {delivered} notification(s)")
+        )
@@ -0,0 +1,127 @@
+import json
+import os
+from itertools import chain, islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from borrowing.models import Borrowing
+from telegram_bot import CHAT_ID, TelegramSender
+
+
+def overdue_message(borrowing_id, user_id, expected_return_date, title):
+    return (
+        f"Borrowing {borrowing_id}: book {title} borrowed by visitor with "
+        f"ID: {user_id} is overdue since {expected_return_date}"
+    )
+
+
+def new_checkpoint(today):
+    return {"date": today, "last_id": 0, "failed": [], "done": False}
+
+
+class Command(BaseCommand):
+    """Sweeps overdue borrowings and sends Telegram reminders in chunks
+
+    Reminders that fail are kept in the checkpoint and sent again by the
+    next run; until none are left the sweep is not done and the command
+    exits with an error.
+    """
+
+    help = "Send reminders for active borrowings past their expected return date"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--checkpoint",
+            default=settings.OVERDUE_CHECKPOINT_FILE,
+            help="File that records progress so an interrupted sweep resumes"
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore today's checkpoint and sweep from the beginning"
+        )
+
+    def read_checkpoint(self, path, today):
+        try:
+            with open(path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return new_checkpoint(today)
+
+        if checkpoint.get("date") != today:
+            return new_checkpoint(today)
+
+        checkpoint.setdefault("failed", [])
+        return checkpoint
+
+    def write_checkpoint(self, path, checkpoint):
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temporary_path, path)
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        path = options["checkpoint"]
+
+        if options["restart"]:
+            checkpoint = new_checkpoint(today.isoformat())
+        else:
+            checkpoint = self.read_checkpoint(path, today.isoformat())
+
+        if checkpoint["done"]:
+            self.stdout.write("Today's sweep is already complete.")
+            return
+
+        overdue = (
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True,
+                expected_return_date__lt=today
+            )
+            .order_by("id")
+            .values_list("id", "user_id", "expected_return_date", "book_id__title")
+        )
+        retries = set(checkpoint["failed"])
+        rows = chain(
+            overdue.filter(id__in=retries).iterator(chunk_size=options["chunk_size"]),
+            overdue.filter(id__gt=checkpoint["last_id"]).iterator(
+                chunk_size=options["chunk_size"]
+            )
+        )
+        sent = 0
+        failures = []
+
+        with TelegramSender(
+            concurrency=options["concurrency"],
+            rate_limit_retries=3
+        ) as sender:
+            while chunk := list(islice(rows, options["chunk_size"])):
+                errors = sender.send_many(
+                    [(CHAT_ID or "", overdue_message(*row)) for row in chunk]
+                )
+                chunk_failures = [
+                    row[0] for row, error in zip(chunk, errors) if error is not None
+                ]
+                failures.extend(chunk_failures)
+                sent += len(chunk) - len(chunk_failures)
+                retries.difference_update(row[0] for row in chunk)
+
+                checkpoint["last_id"] = max(checkpoint["last_id"], chunk[-1][0])
+                checkpoint["failed"] = sorted(retries.union(failures))
+                self.write_checkpoint(path, checkpoint)
+
+        checkpoint["failed"] = failures
+        checkpoint["done"] = not failures
+        self.write_checkpoint(path, checkpoint)
+
+        if failures:
+            raise CommandError(
+                f"Sent {sent} reminder(s), {len(failures)} failed and will be "
+                f"retried on the next run"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminder(s)"))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from books.models import Book
 from django.conf import settings
 
@@ -19,6 +20,56 @@ class Borrowing(models.Model):
         related_name="borrowing",
         db_column="user_id"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user_id", "actual_return_date"],
+                name="borrowing_user_return_idx"
+            ),
+            models.Index(
+                fields=["user_id", "id"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_user_idx"
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_overdue_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"User {self.user_id}, book {self.book_id}"
+
+
+class Notification(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDING = "PENDING"
+        SENT = "SENT"
+        FAILED = "FAILED"
+
+    chat_id = models.CharField(max_length=64)
+    text = models.TextField()
+    status = models.CharField(
+        max_length=16,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="notification_due_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Notification {self.id} ({self.status})"
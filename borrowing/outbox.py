@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from telegram.error import RetryAfter
+
+from borrowing.models import Notification
+
+MAX_ATTEMPTS = 8
+BASE_BACKOFF_SECONDS = 2
+MAX_BACKOFF_SECONDS = 15 * 60
+CLAIM_SECONDS = 5 * 60
+
+
+def backoff_seconds(attempts):
+    return min(BASE_BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+
+
+def claim_batch(batch_size):
+    """Lease a batch of due notifications to this worker.
+
+    Claimed rows are pushed CLAIM_SECONDS into the future, so a worker that
+    dies mid-batch only delays delivery instead of losing it, and parallel
+    workers skip rows another worker has locked.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        notifications = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=Notification.StatusChoices.PENDING,
+                next_attempt_at__lte=now
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        Notification.objects.filter(
+            id__in=[notification.id for notification in notifications]
+        ).update(next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS))
+
+    return notifications
+
+
+def deliver_batch(sender, batch_size):
+    """Send one batch from the outbox and record the outcome.
+
+    Returns the number of notifications that were attempted.
+    """
+    notifications = claim_batch(batch_size)
+
+    if not notifications:
+        return 0
+
+    errors = sender.send_many(
+        [(notification.chat_id, notification.text) for notification in notifications]
+    )
+
+    now = timezone.now()
+    sent_ids = []
+    failed = []
+
+    for notification, error in zip(notifications, errors):
+        if error is None:
+            sent_ids.append(notification.id)
+            continue
+
+        notification.attempts += 1
+        notification.last_error = str(error)
+
+        if isinstance(error, RetryAfter):
+            delay = int(error.retry_after)
+        elif notification.attempts >= MAX_ATTEMPTS:
+            notification.status = Notification.StatusChoices.FAILED
+            delay = 0
+        else:
+            delay = backoff_seconds(notification.attempts)
+
+        notification.next_attempt_at = now + timedelta(seconds=delay)
+        failed.append(notification)
+
+    Notification.objects.filter(id__in=sent_ids).update(
+        status=Notification.StatusChoices.SENT,
+        sent_at=now,
+        attempts=F("attempts") + 1
+    )
+    Notification.objects.bulk_update(
+        failed, ["attempts", "last_error", "status", "next_attempt_at"]
+    )
+
+    return len(notifications)
@@ -1,13 +1,23 @@
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
 from borrowing.models import Borrowing
 
+from books.inventory import (
+    InventoryConflict,
+    take_copy,
+    take_copies,
+    return_copy,
+    return_copies,
+)
+from books.models import Book
 from books.serializers import BookSerializer
-from telegram_bot import notify_borrowing
+from library.fieldsets import FieldsetSerializerMixin
+from telegram_bot import notify_borrowing, notify_borrowings
 
 
-class BorrowingSerializer(serializers.ModelSerializer):
+class BorrowingSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Borrowing
         fields = ("id", "borrow_date", "expected_return_date", "actual_return_date", "book_id", "user_id")
@@ -23,14 +33,15 @@ class BorrowingCreateSerializer(BorrowingSerializer):
         fields = ("id", "borrow_date", "expected_return_date", "book_id", "user_id")
         read_only_fields = ("user_id",)
 
+    @transaction.atomic
     def create(self, validated_data):
         book = validated_data.get("book_id")
 
-        book.inventory -= 1
-        book.save()
+        if not take_copy(book.id):
+            raise serializers.ValidationError({"book_id": "This book is out of stock"})
 
         user = self.context["request"].user
-        validated_data["user_id"] = user
+        validated_data["user_id_id"] = user.id
 
         borrowing = Borrowing.objects.create(**validated_data)
 
@@ -58,12 +69,174 @@ class BorrowingReturnSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        book = instance.book_id
-        book.inventory += 1
-        book.save()
+        now = timezone.now()
+        return_date = now.date()
+
+        returned = Borrowing.objects.filter(
+            pk=instance.pk,
+            actual_return_date__isnull=True
+        ).update(actual_return_date=return_date, updated_at=now)
+
+        if not returned:
+            raise serializers.ValidationError("This book has already been returned")
 
-        instance.actual_return_date = timezone.now().date()
-        instance.save()
+        return_copy(instance.book_id_id)
+        instance.actual_return_date = return_date
+        instance.updated_at = now
 
         return instance
+
+
+class BorrowingBulkCreateSerializer(serializers.Serializer):
+    MODE_PARTIAL = "partial"
+    MODE_ATOMIC = "atomic"
+
+    book_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+    borrow_date = serializers.DateField()
+    expected_return_date = serializers.DateField()
+    mode = serializers.ChoiceField(
+        choices=(MODE_PARTIAL, MODE_ATOMIC),
+        default=MODE_PARTIAL
+    )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """Check out every requested book with a constant number of queries.
+
+        Returns one result per requested book id, in request order. In
+        atomic mode nothing is borrowed unless every item can be.
+        """
+        book_ids = validated_data["book_ids"]
+        books = Book.objects.select_for_update().only(
+            "id", "title", "inventory"
+        ).order_by("id").in_bulk(book_ids)
+
+        remaining = {book.id: book.inventory for book in books.values()}
+        results = []
+        counts = {}
+
+        for book_id in book_ids:
+            if book_id not in books:
+                results.append({"book_id": book_id, "status": "failed", "error": "Book not found"})
+            elif remaining[book_id] == 0:
+                results.append({"book_id": book_id, "status": "failed", "error": "This book is out of stock"})
+            else:
+                remaining[book_id] -= 1
+                counts[book_id] = counts.get(book_id, 0) + 1
+                results.append({"book_id": book_id, "status": "created"})
+
+        failed = any(result["status"] == "failed" for result in results)
+
+        if failed and validated_data["mode"] == self.MODE_ATOMIC:
+            for result in results:
+                if result["status"] == "created":
+                    result["status"] = "skipped"
+            return results
+
+        try:
+            take_copies(counts)
+        except InventoryConflict as error:
+            raise serializers.ValidationError(str(error))
+
+        user = self.context["request"].user
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                borrow_date=validated_data["borrow_date"],
+                expected_return_date=validated_data["expected_return_date"],
+                book_id=books[result["book_id"]],
+                user_id_id=user.id
+            )
+            for result in results
+            if result["status"] == "created"
+        )
+
+        created = iter(borrowings)
+        for result in results:
+            if result["status"] == "created":
+                result["borrowing_id"] = next(created).id
+
+        notify_borrowings(borrowings)
+
+        return results
+
+
+class BorrowingBulkReturnSerializer(serializers.Serializer):
+    borrowing_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500
+    )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        """Return many borrowings with one UPDATE per table.
+
+        Ids outside the caller's queryset are reported as not found and ids
+        that were already returned are reported back instead of failing
+        the whole batch.
+        """
+        borrowing_ids = list(dict.fromkeys(validated_data["borrowing_ids"]))
+        rows = (
+            self.context["queryset"]
+            .select_for_update()
+            .filter(id__in=borrowing_ids)
+            .values_list("id", "book_id", "actual_return_date")
+        )
+        book_by_borrowing = {}
+        already_returned = set()
+
+        for borrowing_id, book_id, actual_return_date in rows:
+            if actual_return_date is None:
+                book_by_borrowing[borrowing_id] = book_id
+            else:
+                already_returned.add(borrowing_id)
+
+        now = timezone.now()
+        returned = Borrowing.objects.filter(
+            id__in=book_by_borrowing.keys(),
+            actual_return_date__isnull=True
+        ).update(actual_return_date=now.date(), updated_at=now)
+
+        if returned != len(book_by_borrowing):
+            raise serializers.ValidationError("Borrowings changed during return, please retry")
+
+        counts = {}
+        for book_id in book_by_borrowing.values():
+            counts[book_id] = counts.get(book_id, 0) + 1
+        return_copies(counts)
+
+        found = set(book_by_borrowing) | already_returned
+
+        return {
+            "returned": [pk for pk in borrowing_ids if pk in book_by_borrowing],
+            "already_returned": [pk for pk in borrowing_ids if pk in already_returned],
+            "not_found": [pk for pk in borrowing_ids if pk not in found],
+        }
+
+
+class BorrowingFineSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    user_id = serializers.IntegerField()
+    book_id = serializers.IntegerField()
+    expected_return_date = serializers.DateField()
+    actual_return_date = serializers.DateField()
+    days_overdue = serializers.IntegerField()
+    fine = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class UserFineSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    overdue_borrowings = serializers.IntegerField()
+    total_fine = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class FineTotalsSerializer(serializers.Serializer):
+    total_fine = serializers.DecimalField(max_digits=12, decimal_places=2)
+    overdue_borrowings = serializers.IntegerField()
+    users = serializers.IntegerField()
@@ -0,0 +1,40 @@
+from telegram.error import NetworkError, RetryAfter
+
+
+class FakeBot:
+    """Stands in for telegram.Bot in tests; records every message sent.
+
+    ``fail_times`` makes the first N sends for each text raise a
+    NetworkError, which is enough to exercise retry and backoff;
+    ``rate_limited_times`` does the same with a zero-second RetryAfter.
+    """
+
+    def __init__(self, fail_times=0, rate_limited_times=0):
+        self.fail_times = fail_times
+        self.rate_limited_times = rate_limited_times
+        self.failures = {}
+        self.rate_limits = {}
+        self.sent = []
+        self.initialized = 0
+        self.shutdowns = 0
+
+    async def initialize(self):
+        self.initialized += 1
+
+    async def shutdown(self):
+        self.shutdowns += 1
+
+    async def send_message(self, text, chat_id):
+        rate_limits = self.rate_limits.get(text, 0)
+
+        if rate_limits < self.rate_limited_times:
+            self.rate_limits[text] = rate_limits + 1
+            raise RetryAfter(0)
+
+        failures = self.failures.get(text, 0)
+
+        if failures < self.fail_times:
+            self.failures[text] = failures + 1
+            raise NetworkError("Telegram is unreachable")
+
+        self.sent.append((chat_id, text))
@@ -1,9 +1,21 @@
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TransactionTestCase
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
+from books.inventory import return_copy
 from books.models import Book
-from borrowing.models import Borrowing
+from borrowing.models import Borrowing, Notification
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from library.pagination import BorrowingPagination
+from library.testing import QueryBudgetMixin
 
 
 class BorrowingCreateTest(APITestCase):
@@ -36,6 +48,22 @@ class BorrowingCreateTest(APITestCase):
         response = self.client.post(self.borrowing_url, data)
         self.assertEqual(response.status_code, 400)
 
+    def test_create_borrowing_with_token_claims(self):
+        self.client.force_authenticate(user=None)
+        token = self.client.post(
+            reverse("user:token_obtain_pair"), {"email": "user@example.com", "password": "password"}
+        ).data["access"]
+        data = {
+            "borrow_date": timezone.now().date(),
+            "expected_return_date": (timezone.now() + timezone.timedelta(days=7)).date(),
+            "book_id": self.book.id,
+        }
+        response = self.client.post(self.borrowing_url, data, HTTP_AUTHORIZE=f"Bearer {token}")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["user_id"], self.user.id)
+        self.assertEqual(Borrowing.objects.get().user_id, self.user)
+
 
 class BorrowingReturnTest(APITestCase):
     def setUp(self):
@@ -90,11 +118,385 @@ class BorrowingFilterTest(APITestCase):
     def test_filter_active_borrowings(self):
         response = self.client.get(self.borrowing_url, {"is_active": "true"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["id"], self.borrowing_active.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], self.borrowing_active.id)
 
     def test_filter_inactive_borrowings(self):
         response = self.client.get(self.borrowing_url, {"is_active": "false"})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["id"], self.borrowing_inactive.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], self.borrowing_inactive.id)
+
+
+class BorrowingConcurrencyTest(TransactionTestCase):
+    copies = 5
+    borrowers = 200
+    # Each borrower holds its own connection while its request runs; keep
+    # well below PostgreSQL's default max_connections of 100.
+    max_connections = 20
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.book = Book.objects.create(
+            title="Test Book", author="Author", cover="HARD", inventory=self.copies, daily_fee=5.00
+        )
+        self.borrowing_url = reverse("borrowing:borrowing-list")
+
+    def borrow(self, barrier, slots, statuses):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        data = {
+            "borrow_date": timezone.now().date(),
+            "expected_return_date": (timezone.now() + timezone.timedelta(days=7)).date(),
+            "book_id": self.book.id,
+        }
+        barrier.wait()
+        with slots:
+            try:
+                statuses.append(client.post(self.borrowing_url, data).status_code)
+            finally:
+                connection.close()
+
+    def test_concurrent_borrows_never_oversell(self):
+        barrier = threading.Barrier(self.borrowers)
+        slots = threading.BoundedSemaphore(self.max_connections)
+        statuses = []
+        threads = [
+            threading.Thread(target=self.borrow, args=(barrier, slots, statuses))
+            for _ in range(self.borrowers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses.count(201), self.copies)
+        self.assertEqual(statuses.count(400), self.borrowers - self.copies)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(book_id=self.book).count(), self.copies)
+
+
+class BorrowingQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.admin_user = get_user_model().objects.create_superuser(email="admin@example.com", password="password")
+        books = Book.objects.bulk_create(
+            Book(title=f"Book {number}", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+            for number in range(20)
+        )
+        self.borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                borrow_date=timezone.now().date(),
+                expected_return_date=(timezone.now() + timezone.timedelta(days=7)).date(),
+                book_id=book,
+                user_id=self.user
+            )
+            for book in books
+        )
+        self.borrowing_url = reverse("borrowing:borrowing-list")
+
+    def test_list_borrowings_query_budget(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.assertQueryBudget(2, "get", self.borrowing_url)
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_staff_list_borrowings_query_budget(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.assertQueryBudget(2, "get", self.borrowing_url, {"user_id": self.user.id})
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_retrieve_borrowing_query_budget(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("borrowing:borrowing-detail", args=[self.borrowings[0].id])
+        response = self.assertQueryBudget(2, "get", url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_return_borrowing_query_budget(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse("borrowing:borrowing-return-borrowing", args=[self.borrowings[0].id])
+        response = self.assertQueryBudget(6, "get", url)
+        self.assertEqual(response.status_code, 201)
+
+
+class BorrowingPaginationTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.book = Book.objects.create(title="Test Book", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+        self.borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                borrow_date=timezone.now().date(),
+                expected_return_date=(timezone.now() + timezone.timedelta(days=7)).date(),
+                book_id=self.book,
+                user_id=self.user
+            )
+            for _ in range(7)
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_cursor_pages_cover_all_rows_newest_first(self):
+        url = reverse("borrowing:borrowing-list") + "?page_size=3"
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 3)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+
+        expected = sorted((borrowing.id for borrowing in Borrowing.objects.all()), reverse=True)
+        self.assertEqual(ids, expected)
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(BorrowingPagination, "max_page_size", 2):
+            response = self.client.get(reverse("borrowing:borrowing-list"), {"page_size": 100})
+        self.assertEqual(len(response.data["results"]), 2)
+
+
+class BorrowingConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.book = Book.objects.create(title="Test Book", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+        self.borrowing = Borrowing.objects.create(
+            borrow_date=timezone.now().date(),
+            expected_return_date=(timezone.now() + timezone.timedelta(days=7)).date(),
+            book_id=self.book,
+            user_id=self.user
+        )
+        self.borrowing_url = reverse("borrowing:borrowing-list")
+        self.client.force_authenticate(user=self.user)
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.borrowing_url, {"is_active": "true"})["ETag"]
+
+        response = self.client.get(self.borrowing_url, {"is_active": "true"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_return_changes_etag(self):
+        etag = self.client.get(self.borrowing_url, {"is_active": "true"})["ETag"]
+
+        self.client.get(reverse("borrowing:borrowing-return-borrowing", args=[self.borrowing.id]))
+
+        response = self.client.get(self.borrowing_url, {"is_active": "true"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [])
+
+    def test_book_change_changes_etag(self):
+        etag = self.client.get(self.borrowing_url)["ETag"]
+
+        return_copy(self.book.id)
+
+        response = self.client.get(self.borrowing_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["results"][0]["book_id"]["inventory"], 1)
+
+    def test_retrieve_sends_last_modified(self):
+        url = reverse("borrowing:borrowing-detail", args=[self.borrowing.id])
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+
+class ExplainBorrowingQueriesCommandTest(APITestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        book = Book.objects.create(title="Test Book", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+        Borrowing.objects.create(
+            borrow_date=timezone.now().date(),
+            expected_return_date=timezone.now().date(),
+            book_id=book,
+            user_id=user
+        )
+
+    def test_reports_every_query(self):
+        out = StringIO()
+        call_command("explain_borrowing_queries", "--verbose-plans", stdout=out)
+
+        for label in ("user history", "user active", "user returned", "all active", "overdue"):
+            self.assertIn(f"{label}: ", out.getvalue())
+
+
+class BorrowingBulkCreateTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.books = Book.objects.bulk_create(
+            Book(title=f"Book {number}", author="Author", cover="HARD", inventory=1, daily_fee=5.00)
+            for number in range(20)
+        )
+        self.bulk_url = reverse("borrowing:borrowing-bulk-borrow")
+        self.client.force_authenticate(user=self.user)
+
+    def payload(self, book_ids, mode="partial"):
+        return {
+            "book_ids": book_ids,
+            "borrow_date": timezone.now().date(),
+            "expected_return_date": (timezone.now() + timezone.timedelta(days=7)).date(),
+            "mode": mode,
+        }
+
+    def test_bulk_borrow_all_available(self):
+        book_ids = [book.id for book in self.books[:3]]
+        response = self.client.post(self.bulk_url, self.payload(book_ids), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result["status"] for result in response.data["results"]], ["created"] * 3)
+        self.assertEqual(Borrowing.objects.filter(user_id=self.user).count(), 3)
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertFalse(Book.objects.filter(id__in=book_ids, inventory__gt=0).exists())
+
+    def test_partial_mode_reports_failures(self):
+        book = self.books[0]
+        response = self.client.post(self.bulk_url, self.payload([book.id, book.id, 999999]), format="json")
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["created", "failed", "failed"]
+        )
+        self.assertEqual(response.data["results"][1]["error"], "This book is out of stock")
+        self.assertEqual(response.data["results"][2]["error"], "Book not found")
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 0)
+
+    def test_atomic_mode_borrows_nothing_on_failure(self):
+        book = self.books[0]
+        response = self.client.post(
+            self.bulk_url, self.payload([self.books[1].id, book.id, book.id], mode="atomic"), format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["skipped", "skipped", "failed"]
+        )
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(Book.objects.filter(inventory=1).count(), 20)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        counts = []
+        for books in (self.books[:2], self.books[2:20]):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(
+                    self.bulk_url, self.payload([book.id for book in books]), format="json"
+                )
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(context))
+
+        self.assertEqual(counts[0], counts[1])
+
+
+class BorrowingBulkReturnTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.other_user = get_user_model().objects.create_user(email="other@example.com", password="password")
+        self.book = Book.objects.create(title="Test Book", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+        self.other_book = Book.objects.create(title="Other Book", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+        self.borrowings = [
+            Borrowing.objects.create(
+                borrow_date=timezone.now().date(),
+                expected_return_date=(timezone.now() + timezone.timedelta(days=7)).date(),
+                book_id=book,
+                user_id=self.user
+            )
+            for book in (self.book, self.book, self.other_book)
+        ]
+        self.bulk_return_url = reverse("borrowing:borrowing-bulk-return")
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_return_restores_inventory(self):
+        ids = [borrowing.id for borrowing in self.borrowings]
+        response = self.client.post(self.bulk_return_url, {"borrowing_ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["returned"], ids)
+        self.book.refresh_from_db()
+        self.other_book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 2)
+        self.assertEqual(self.other_book.inventory, 1)
+        self.assertFalse(Borrowing.objects.filter(actual_return_date__isnull=True).exists())
+
+    def test_reports_already_returned_and_unknown_ids(self):
+        returned = self.borrowings[0]
+        returned.actual_return_date = timezone.now().date()
+        returned.save()
+        foreign = Borrowing.objects.create(
+            borrow_date=timezone.now().date(),
+            expected_return_date=timezone.now().date(),
+            book_id=self.book,
+            user_id=self.other_user
+        )
+
+        ids = [returned.id, self.borrowings[1].id, foreign.id]
+        response = self.client.post(self.bulk_return_url, {"borrowing_ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["returned"], [self.borrowings[1].id])
+        self.assertEqual(response.data["already_returned"], [returned.id])
+        self.assertEqual(response.data["not_found"], [foreign.id])
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+
+
+class BorrowingBulkReturnConcurrencyTest(TransactionTestCase):
+    borrowings_count = 30
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.book = Book.objects.create(title="Test Book", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+        self.borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                borrow_date=timezone.now().date(),
+                expected_return_date=(timezone.now() + timezone.timedelta(days=7)).date(),
+                book_id=self.book,
+                user_id=self.user
+            )
+            for _ in range(self.borrowings_count)
+        )
+
+    def run_request(self, barrier, results, method, url, data=None):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        try:
+            barrier.wait()
+            results.append((url, getattr(client, method)(url, data, format="json")))
+        finally:
+            connection.close()
+
+    def test_bulk_and_single_returns_count_each_borrowing_once(self):
+        ids = [borrowing.id for borrowing in self.borrowings]
+        requests = [("post", reverse("borrowing:borrowing-bulk-return"), {"borrowing_ids": ids})]
+        requests += [
+            ("get", reverse("borrowing:borrowing-return-borrowing", args=[pk]), None)
+            for pk in ids
+        ]
+        barrier = threading.Barrier(len(requests))
+        results = []
+        threads = [
+            threading.Thread(target=self.run_request, args=(barrier, results, *request))
+            for request in requests
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        bulk_returned = [
+            response.data["returned"] for url, response in results if url.endswith("bulk_return/")
+        ][0]
+        single_returned = [
+            response for url, response in results
+            if not url.endswith("bulk_return/") and response.status_code == 201
+        ]
+
+        self.assertEqual(len(bulk_returned) + len(single_returned), self.borrowings_count)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, self.borrowings_count)
+        self.assertFalse(Borrowing.objects.filter(actual_return_date__isnull=True).exists())
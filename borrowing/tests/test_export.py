@@ -0,0 +1,92 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+
+from books.models import Book
+from borrowing.models import Borrowing
+
+
+class BorrowingExportTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(email="admin@example.com", password="password")
+        self.reader = get_user_model().objects.create_user(email="reader@example.com", password="password")
+        book = Book.objects.create(title="Exported Book", author="Author", cover="HARD", inventory=1, daily_fee=1.00)
+        today = timezone.now().date()
+
+        self.old = Borrowing.objects.create(
+            borrow_date=today - timezone.timedelta(days=30),
+            expected_return_date=today - timezone.timedelta(days=20),
+            actual_return_date=today - timezone.timedelta(days=21),
+            book_id=book,
+            user_id=self.reader
+        )
+        self.recent = Borrowing.objects.create(
+            borrow_date=today,
+            expected_return_date=today + timezone.timedelta(days=7),
+            book_id=book,
+            user_id=self.admin_user
+        )
+        self.export_url = reverse("borrowing:borrowing-export")
+        self.client.force_authenticate(user=self.admin_user)
+
+    def read_csv(self, response):
+        content = b"".join(response.streaming_content).decode()
+        return list(csv.DictReader(StringIO(content)))
+
+    def test_export_csv(self):
+        response = self.client.get(self.export_url)
+        rows = self.read_csv(response)
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("borrowings.csv", response["Content-Disposition"])
+        self.assertEqual([int(row["id"]) for row in rows], [self.old.id, self.recent.id])
+        self.assertEqual(rows[0]["book_title"], "Exported Book")
+        self.assertEqual(rows[0]["user_email"], "reader@example.com")
+        self.assertEqual(rows[1]["actual_return_date"], "")
+
+    def test_export_ndjson_with_filters(self):
+        response = self.client.get(
+            self.export_url,
+            {"file_format": "ndjson", "is_active": "false", "borrowed_before": timezone.now().date() - timezone.timedelta(days=1)}
+        )
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual([row["id"] for row in rows], [self.old.id])
+
+    def test_export_is_scoped_to_own_borrowings(self):
+        self.client.force_authenticate(user=self.reader)
+        rows = self.read_csv(self.client.get(self.export_url))
+
+        self.assertEqual([int(row["id"]) for row in rows], [self.old.id])
+
+    def test_invalid_filters_are_rejected(self):
+        self.assertEqual(self.client.get(self.export_url, {"file_format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get(self.export_url, {"borrowed_after": "yesterday"}).status_code, 400)
+
+    def test_date_range_filters_apply_to_list(self):
+        response = self.client.get(
+            reverse("borrowing:borrowing-list"), {"borrowed_after": timezone.now().date()}
+        )
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.recent.id])
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command("export_borrowings", "--format", "ndjson", "--user-id", self.reader.id, stdout=out)
+        self.assertEqual([json.loads(line)["id"] for line in out.getvalue().splitlines()], [self.old.id])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "borrowings.csv")
+            call_command("export_borrowings", "--output", path, "--is-active", "true", stderr=StringIO())
+            with open(path, newline="") as export_file:
+                rows = list(csv.DictReader(export_file))
+
+        self.assertEqual([int(row["id"]) for row in rows], [self.recent.id])
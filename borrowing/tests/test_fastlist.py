@@ -0,0 +1,147 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIClient
+
+from books.models import Book
+from borrowing.models import Borrowing
+from library.fastlist import compile_rows
+from library.renderers import ORJSONRenderer
+
+ORJSON_ACCEPT = "application/json; engine=orjson"
+
+
+class FastListTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(email="admin@example.com", password="password")
+        today = django_timezone.now().date()
+
+        for number, fee in enumerate(("0.50", "12.00", "3.99")):
+            book = Book.objects.create(
+                title=f"Book ⁂ {number}", author="Author", cover="SOFT", inventory=number, daily_fee=fee
+            )
+            Borrowing.objects.create(
+                borrow_date=today - django_timezone.timedelta(days=20),
+                expected_return_date=today - django_timezone.timedelta(days=6),
+                actual_return_date=today if number else None,
+                book_id=book,
+                user_id=self.admin_user
+            )
+
+        self.client.force_authenticate(user=self.admin_user)
+
+    def assertSameAsSerializer(self, url, params=None):
+        responses = []
+        for enabled in (False, True):
+            cache.clear()
+            with override_settings(FAST_LIST_SERIALIZATION=enabled):
+                responses.append(self.client.get(url, params or {}))
+
+        self.assertEqual(responses[0].status_code, 200)
+        self.assertEqual(responses[1].content, responses[0].content)
+
+    def test_borrowing_list_matches_serializer_output(self):
+        url = reverse("borrowing:borrowing-list")
+
+        self.assertSameAsSerializer(url)
+        self.assertSameAsSerializer(url, {"page_size": 1})
+        self.assertSameAsSerializer(url, {"fields": "id,actual_return_date,book_id.daily_fee"})
+        self.assertSameAsSerializer(url, {"omit": "book_id"})
+
+    def test_book_list_matches_serializer_output(self):
+        url = reverse("books:books-list")
+
+        self.assertSameAsSerializer(url)
+        self.assertSameAsSerializer(url, {"search": "book", "limit": 2})
+        self.assertSameAsSerializer(url, {"fields": "inventory"})
+
+    def test_cursor_pages_continue_without_the_ordering_field(self):
+        url = reverse("borrowing:borrowing-list")
+        seen = []
+        params = {"fields": "actual_return_date", "page_size": 1}
+
+        while url:
+            response = self.client.get(url, params)
+            seen.extend(response.data["results"])
+            url, params = response.data["next"], None
+
+        self.assertEqual(len(seen), 3)
+
+    def test_unsupported_serializers_are_not_compiled(self):
+        class TitleSerializer(serializers.ModelSerializer):
+            shout = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Book
+                fields = ("title", "shout")
+
+            def get_shout(self, book):
+                return book.title.upper()
+
+        self.assertIsNone(compile_rows(TitleSerializer()))
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_output_matches_json_renderer(self):
+        data = {
+            "text": "naïve \u2028 line",
+            "lazy": gettext_lazy("Not found."),
+            "fee": Decimal("4.50"),
+            "day": date(2024, 2, 29),
+            "moment": datetime(2024, 2, 29, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "counts": {1: "one"},
+            "rows": [{"id": 1, "active": True, "returned": None}],
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {"id": 1}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2")
+        )
+
+
+class ORJSONNegotiationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Book.objects.create(title="Rendered Book", author="Author", cover="HARD", inventory=1, daily_fee=1.00)
+        self.url = reverse("books:books-list")
+
+    def test_orjson_is_selected_by_media_type_parameter(self):
+        default = self.client.get(self.url, HTTP_ACCEPT="application/json")
+        fast = self.client.get(self.url, HTTP_ACCEPT=ORJSON_ACCEPT)
+
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(default["Content-Type"], "application/json")
+        self.assertEqual(fast["Content-Type"], ORJSON_ACCEPT)
+        self.assertEqual(fast.content, default.content)
+
+    def test_orjson_is_selected_by_format(self):
+        response = self.client.get(self.url, {"format": "orjson"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], ORJSON_ACCEPT)
+        self.assertEqual(response.json()["results"][0]["title"], "Rendered Book")
+
+    def test_json_stays_the_default(self):
+        for accept in ("*/*", "application/json; indent=2"):
+            response = self.client.get(self.url, HTTP_ACCEPT=accept)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "application/json")
+
+        response = self.client.get(self.url, HTTP_ACCEPT="text/csv")
+        self.assertEqual(response.status_code, 406)
+        self.assertEqual(response["Content-Type"], "application/json")
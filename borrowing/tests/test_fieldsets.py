@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+
+from books.models import Book
+from borrowing.models import Borrowing
+from library.fieldsets import parse_paths
+
+
+class ParsePathsTest(SimpleTestCase):
+    def test_nested_paths_are_grouped(self):
+        self.assertEqual(
+            parse_paths("id, book_id.title,book_id.inventory,,"),
+            {"id": None, "book_id": {"title": None, "inventory": None}}
+        )
+
+    def test_whole_field_wins_over_subfields(self):
+        self.assertEqual(parse_paths("book_id.title,book_id"), {"book_id": None})
+        self.assertEqual(parse_paths("book_id,book_id.title"), {"book_id": None})
+
+
+class BookFieldsetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="Sparse Book", author="Author", cover="HARD", inventory=3, daily_fee=1.00
+        )
+        self.list_url = reverse("books:books-list")
+
+    def test_list_returns_and_loads_only_requested_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {"fields": "id,inventory"})
+
+        self.assertEqual(response.data["results"], [{"id": self.book.id, "inventory": 3}])
+        select = queries.captured_queries[-1]["sql"]
+        self.assertIn('"inventory"', select)
+        self.assertNotIn('"title"', select)
+
+    def test_retrieve_omits_fields(self):
+        response = self.client.get(
+            reverse("books:books-detail", args=[self.book.id]),
+            {"omit": "author,cover"}
+        )
+
+        self.assertEqual(set(response.data), {"id", "title", "inventory", "daily_fee"})
+
+    def test_fieldsets_are_cached_separately(self):
+        self.client.get(self.list_url)
+
+        response = self.client.get(self.list_url, {"fields": "inventory"})
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"], [{"inventory": 3}])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.list_url, {"fields": "id,isbn"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["fields"], "Unknown fields: isbn")
+
+
+class BorrowingFieldsetTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="reader@example.com", password="password")
+        today = timezone.now().date()
+
+        for number in range(3):
+            book = Book.objects.create(
+                title=f"Book {number}", author="Author", cover="HARD", inventory=1, daily_fee=1.00
+            )
+            Borrowing.objects.create(
+                borrow_date=today,
+                expected_return_date=today + timezone.timedelta(days=7),
+                book_id=book,
+                user_id=self.user
+            )
+
+        self.list_url = reverse("borrowing:borrowing-list")
+        self.client.force_authenticate(user=self.user)
+
+    def get_list(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, params)
+
+        self.assertEqual(response.status_code, 200)
+        return response, [query["sql"] for query in queries.captured_queries]
+
+    def test_book_is_not_joined_without_book_fields(self):
+        response, queries = self.get_list({"fields": "id,expected_return_date"})
+
+        self.assertEqual(set(response.data["results"][0]), {"id", "expected_return_date"})
+        self.assertFalse(any("JOIN" in sql for sql in queries))
+
+    def test_nested_book_fields_are_projected(self):
+        response, queries = self.get_list({"fields": "id,book_id.id,book_id.inventory"})
+
+        self.assertEqual(
+            [set(row["book_id"]) for row in response.data["results"]],
+            [{"id", "inventory"}] * 3
+        )
+        select = next(sql for sql in queries if "JOIN" in sql)
+        self.assertNotIn('"books_book"."title"', select)
+        book_queries = [sql for sql in queries if "books_book" in sql and "MAX(" not in sql]
+        self.assertEqual(len(book_queries), 1)
+
+    def test_nested_book_fields_can_be_omitted(self):
+        response, _ = self.get_list({"omit": "borrow_date,book_id.author,book_id.cover"})
+
+        row = response.data["results"][0]
+        self.assertNotIn("borrow_date", row)
+        self.assertEqual(set(row["book_id"]), {"id", "title", "inventory", "daily_fee"})
+
+    def test_subfields_of_plain_fields_are_rejected(self):
+        response = self.client.get(self.list_url, {"fields": "id,borrow_date.year"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["fields"], "borrow_date has no subfields")
+
+    def test_fieldset_is_ignored_on_writes(self):
+        book = Book.objects.create(
+            title="Fresh Book", author="Author", cover="HARD", inventory=1, daily_fee=1.00
+        )
+        today = timezone.now().date()
+
+        response = self.client.post(
+            f"{self.list_url}?fields=id",
+            {
+                "book_id": book.id,
+                "borrow_date": today,
+                "expected_return_date": today + timezone.timedelta(days=7),
+            }
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("book_id", response.data)
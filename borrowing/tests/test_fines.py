@@ -0,0 +1,89 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+
+from books.models import Book
+from borrowing.fines import fines_by_borrowing
+from borrowing.models import Borrowing
+
+
+class FinesTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_superuser(email="admin@example.com", password="password")
+        self.reader = get_user_model().objects.create_user(email="reader@example.com", password="password")
+        self.other_reader = get_user_model().objects.create_user(email="other@example.com", password="password")
+        pricey = Book.objects.create(title="Pricey", author="Author", cover="HARD", inventory=1, daily_fee="2.50")
+        cheap = Book.objects.create(title="Cheap", author="Author", cover="SOFT", inventory=1, daily_fee="1.00")
+        today = timezone.now().date()
+        days = timezone.timedelta
+
+        self.returned_late = Borrowing.objects.create(
+            borrow_date=today - days(20), expected_return_date=today - days(10),
+            actual_return_date=today - days(7), book_id=pricey, user_id=self.reader
+        )
+        self.still_out = Borrowing.objects.create(
+            borrow_date=today - days(10), expected_return_date=today - days(4),
+            book_id=cheap, user_id=self.reader
+        )
+        self.other_late = Borrowing.objects.create(
+            borrow_date=today - days(10), expected_return_date=today - days(1),
+            book_id=pricey, user_id=self.other_reader
+        )
+        Borrowing.objects.create(
+            borrow_date=today - days(10), expected_return_date=today - days(3),
+            actual_return_date=today - days(3), book_id=pricey, user_id=self.reader
+        )
+        Borrowing.objects.create(
+            borrow_date=today, expected_return_date=today + days(7), book_id=cheap, user_id=self.reader
+        )
+        self.fines_url = reverse("borrowing:borrowing-fines")
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_fines_are_computed_in_the_database(self):
+        fines = {row["id"]: row for row in fines_by_borrowing(Borrowing.objects.all())}
+
+        self.assertEqual(set(fines), {self.returned_late.id, self.still_out.id, self.other_late.id})
+        self.assertEqual(fines[self.returned_late.id]["days_overdue"], 3)
+        self.assertEqual(fines[self.returned_late.id]["fine"], Decimal("7.50"))
+        self.assertEqual(fines[self.still_out.id]["fine"], Decimal("4.00"))
+
+    def test_fines_grouped_by_user(self):
+        response = self.client.get(self.fines_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["user_id"], row["total_fine"]) for row in response.data["results"]],
+            [(self.reader.id, "11.50"), (self.other_reader.id, "2.50")]
+        )
+        self.assertEqual(
+            dict(response.data["totals"]),
+            {"total_fine": "14.00", "overdue_borrowings": 3, "users": 2}
+        )
+
+    def test_fines_grouped_by_borrowing_with_filters(self):
+        response = self.client.get(
+            self.fines_url, {"group_by": "borrowing", "user_id": self.reader.id, "is_active": "true"}
+        )
+
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.still_out.id])
+        self.assertEqual(response.data["totals"]["total_fine"], "4.00")
+
+    def test_fines_stream_as_ndjson(self):
+        response = self.client.get(self.fines_url, {"stream": "ndjson"})
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[-1]["totals"]["total_fine"], "14.00")
+
+    def test_fines_are_admin_only(self):
+        self.client.force_authenticate(user=self.reader)
+        self.assertEqual(self.client.get(self.fines_url).status_code, 403)
+
+    def test_unknown_grouping_is_rejected(self):
+        self.assertEqual(self.client.get(self.fines_url, {"group_by": "book"}).status_code, 400)
@@ -0,0 +1,134 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+from rest_framework.test import APITestCase, APIClient
+
+from books.models import Book
+from borrowing.models import Borrowing
+from library.renderers import MessagePackRenderer, columns
+
+MSGPACK = "application/msgpack"
+MSGPACK_COLUMNS = "application/msgpack; layout=columns"
+
+
+class MessagePackRendererTest(SimpleTestCase):
+    def test_decimals_and_dates_keep_their_precision(self):
+        content = MessagePackRenderer().render({
+            "fee": Decimal("12345678901234.56"),
+            "day": date(2024, 2, 29),
+            "moment": datetime(2024, 2, 29, 12, 30, tzinfo=timezone.utc),
+        })
+
+        self.assertEqual(
+            msgpack.unpackb(content),
+            {"fee": "12345678901234.56", "day": "2024-02-29", "moment": "2024-02-29T12:30:00Z"}
+        )
+
+    def test_columns_need_rows_with_the_same_keys(self):
+        self.assertEqual(
+            columns([{"id": 1, "title": "A"}, {"id": 2, "title": "B"}]),
+            {"id": [1, 2], "title": ["A", "B"]}
+        )
+        self.assertEqual(columns([{"id": 1}, {"title": "B"}]), [{"id": 1}, {"title": "B"}])
+        self.assertEqual(columns([]), [])
+
+
+class MessagePackApiTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="kiosk@example.com", password="password")
+        self.book = Book.objects.create(
+            title="Packed Book", author="Author", cover="HARD", inventory=5, daily_fee="12.05"
+        )
+        Book.objects.create(title="Other Book", author="Author", cover="SOFT", inventory=1, daily_fee="0.10")
+        today = django_timezone.now().date()
+        Borrowing.objects.create(
+            borrow_date=today,
+            expected_return_date=today + django_timezone.timedelta(days=7),
+            book_id=self.book,
+            user_id=self.user
+        )
+
+    def test_list_matches_json(self):
+        self.client.force_authenticate(user=self.user)
+
+        for url in (reverse("books:books-list"), reverse("borrowing:borrowing-list")):
+            response = self.client.get(url, HTTP_ACCEPT=MSGPACK)
+
+            self.assertEqual(response["Content-Type"], MSGPACK)
+            self.assertEqual(msgpack.unpackb(response.content), self.client.get(url).json())
+
+    def test_columns_layout(self):
+        url = reverse("books:books-list")
+
+        response = self.client.get(url, HTTP_ACCEPT=MSGPACK_COLUMNS)
+        results = msgpack.unpackb(response.content)["results"]
+
+        self.assertEqual(response["Content-Type"], MSGPACK_COLUMNS)
+        self.assertEqual(results["daily_fee"], ["12.05", "0.10"])
+        self.assertEqual(
+            [dict(zip(results, row)) for row in zip(*results.values())],
+            self.client.get(url).json()["results"]
+        )
+
+    def test_borrowing_is_created_from_msgpack(self):
+        self.client.force_authenticate(user=self.user)
+        today = django_timezone.now().date()
+
+        response = self.client.post(
+            reverse("borrowing:borrowing-list"),
+            msgpack.packb({
+                "book_id": self.book.id,
+                "borrow_date": today.isoformat(),
+                "expected_return_date": (today + django_timezone.timedelta(days=3)).isoformat(),
+            }),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.content)["book_id"], self.book.id)
+
+    def test_token_is_obtained_with_msgpack(self):
+        response = self.client.post(
+            reverse("user:token_obtain_pair"),
+            msgpack.packb({"email": "kiosk@example.com", "password": "password"}),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(msgpack.unpackb(response.content)), {"access", "refresh"})
+
+    def test_malformed_body_is_rejected(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(
+            reverse("borrowing:borrowing-list"),
+            b"\xc1",
+            content_type=MSGPACK
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_columns_layout_by_format(self):
+        response = self.client.get(reverse("books:books-list"), {"format": "msgpack-columns"})
+
+        self.assertEqual(response["Content-Type"], MSGPACK_COLUMNS)
+        self.assertEqual(msgpack.unpackb(response.content)["results"]["inventory"], [5, 1])
+
+    def test_formats_get_their_own_etag(self):
+        url = reverse("books:books-list")
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_ACCEPT=MSGPACK, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,109 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase, APIClient
+
+from books.models import Book
+from borrowing.models import Notification
+from borrowing.outbox import deliver_batch, MAX_ATTEMPTS
+from borrowing.tests.fake_bot import FakeBot
+from telegram_bot import TelegramSender
+
+
+class BorrowingOutboxTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.book = Book.objects.create(title="Test Book", author="Author", cover="HARD", inventory=2, daily_fee=5.00)
+        self.client.force_authenticate(user=self.user)
+
+    def test_borrowing_queues_notification(self):
+        data = {
+            "borrow_date": timezone.now().date(),
+            "expected_return_date": (timezone.now() + timezone.timedelta(days=7)).date(),
+            "book_id": self.book.id,
+        }
+        response = self.client.post(reverse("borrowing:borrowing-list"), data)
+        self.assertEqual(response.status_code, 201)
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.status, Notification.StatusChoices.PENDING)
+        self.assertEqual(
+            notification.text,
+            f"Book Test Book was borrowed by visitor with ID: {self.user.id}"
+        )
+
+
+class OutboxWorkerTest(APITestCase):
+    def setUp(self):
+        for number in range(3):
+            Notification.objects.create(chat_id="42", text=f"message {number}")
+
+    def test_deliver_batch_marks_sent(self):
+        bot = FakeBot()
+        with TelegramSender(bot=bot) as sender:
+            self.assertEqual(deliver_batch(sender, batch_size=2), 2)
+            self.assertEqual(deliver_batch(sender, batch_size=2), 1)
+            self.assertEqual(deliver_batch(sender, batch_size=2), 0)
+
+        self.assertEqual(len(bot.sent), 3)
+        self.assertEqual(bot.initialized, 1)
+        self.assertEqual(bot.shutdowns, 1)
+        self.assertFalse(
+            Notification.objects.exclude(status=Notification.StatusChoices.SENT).exists()
+        )
+
+    def test_failed_send_is_retried_with_backoff(self):
+        bot = FakeBot(fail_times=1)
+        with TelegramSender(bot=bot) as sender:
+            deliver_batch(sender, batch_size=10)
+
+            notification = Notification.objects.first()
+            self.assertEqual(notification.status, Notification.StatusChoices.PENDING)
+            self.assertEqual(notification.attempts, 1)
+            self.assertGreater(notification.next_attempt_at, timezone.now())
+
+            Notification.objects.update(next_attempt_at=timezone.now())
+            deliver_batch(sender, batch_size=10)
+
+        self.assertEqual(len(bot.sent), 3)
+        self.assertFalse(
+            Notification.objects.exclude(status=Notification.StatusChoices.SENT).exists()
+        )
+
+    def test_sends_are_counted_by_outcome(self):
+        def count(outcome):
+            return REGISTRY.get_sample_value("telegram_messages_total", {"outcome": outcome}) or 0
+
+        sent, errors = count("sent"), count("error")
+
+        with TelegramSender(bot=FakeBot(fail_times=1)) as sender:
+            deliver_batch(sender, batch_size=10)
+
+        self.assertEqual(count("error"), errors + 3)
+        self.assertEqual(count("sent"), sent)
+
+    def test_notification_fails_after_max_attempts(self):
+        Notification.objects.update(attempts=MAX_ATTEMPTS - 1)
+        with TelegramSender(bot=FakeBot(fail_times=1)) as sender:
+            deliver_batch(sender, batch_size=10)
+
+        self.assertEqual(
+            Notification.objects.filter(status=Notification.StatusChoices.FAILED).count(),
+            3
+        )
+
+    def test_command_drains_outbox(self):
+        bot = FakeBot()
+        with mock.patch(
+            "borrowing.management.commands.send_notifications.TelegramSender",
+            side_effect=lambda concurrency: TelegramSender(bot=bot, concurrency=concurrency)
+        ):
+            call_command("send_notifications", "--once", stdout=StringIO())
+
+        self.assertEqual(len(bot.sent), 3)
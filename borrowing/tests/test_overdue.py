@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from books.models import Book
+from borrowing.models import Borrowing
+from borrowing.tests.fake_bot import FakeBot
+from telegram_bot import TelegramSender
+
+COMMAND_MODULE = "borrowing.management.commands.send_overdue_reminders"
+
+
+class SendOverdueRemindersTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        book = Book.objects.create(title="Late Book", author="Author", cover="HARD", inventory=0, daily_fee=5.00)
+        today = timezone.now().date()
+        week_ago = today - timezone.timedelta(days=7)
+
+        self.overdue = Borrowing.objects.bulk_create(
+            Borrowing(borrow_date=week_ago, expected_return_date=week_ago, book_id=book, user_id=user)
+            for _ in range(5)
+        )
+        Borrowing.objects.create(
+            borrow_date=today, expected_return_date=today + timezone.timedelta(days=7), book_id=book, user_id=user
+        )
+        Borrowing.objects.create(
+            borrow_date=week_ago, expected_return_date=week_ago, actual_return_date=today, book_id=book, user_id=user
+        )
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, "checkpoint.json")
+        self.bot = FakeBot()
+
+    def run_command(self, *args):
+        with mock.patch(
+            f"{COMMAND_MODULE}.TelegramSender",
+            side_effect=lambda **kwargs: TelegramSender(bot=self.bot, **kwargs)
+        ):
+            call_command(
+                "send_overdue_reminders", "--checkpoint", self.checkpoint, *args, stdout=StringIO()
+            )
+
+    def test_sends_one_reminder_per_overdue_borrowing(self):
+        self.run_command("--chunk-size", "2")
+
+        self.assertEqual(len(self.bot.sent), 5)
+        self.assertIn("Late Book", self.bot.sent[0][1])
+        with open(self.checkpoint) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.assertTrue(checkpoint["done"])
+        self.assertEqual(checkpoint["last_id"], self.overdue[-1].id)
+
+    def test_completed_sweep_is_not_repeated(self):
+        self.run_command()
+        self.run_command()
+
+        self.assertEqual(len(self.bot.sent), 5)
+
+    def test_interrupted_sweep_resumes_from_checkpoint(self):
+        send_many = TelegramSender.send_many
+        calls = []
+
+        def interrupt_after_first_chunk(sender, messages):
+            calls.append(messages)
+            if len(calls) > 1:
+                raise KeyboardInterrupt
+            return send_many(sender, messages)
+
+        with mock.patch.object(TelegramSender, "send_many", interrupt_after_first_chunk):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_command("--chunk-size", "2")
+
+        self.assertEqual(len(self.bot.sent), 2)
+
+        self.run_command("--chunk-size", "2")
+        self.assertEqual(len(self.bot.sent), 5)
+        self.assertEqual(len({text for _, text in self.bot.sent}), 5)
+
+    def test_rate_limited_sends_are_retried(self):
+        self.bot = FakeBot(rate_limited_times=2)
+        self.run_command()
+
+        self.assertEqual(len(self.bot.sent), 5)
+
+    def test_failed_reminders_are_retried_on_the_next_run(self):
+        self.bot = FakeBot(fail_times=1)
+
+        with self.assertRaises(CommandError):
+            self.run_command("--chunk-size", "2")
+
+        self.assertEqual(self.bot.sent, [])
+        with open(self.checkpoint) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.assertFalse(checkpoint["done"])
+        self.assertEqual(checkpoint["failed"], [borrowing.id for borrowing in self.overdue])
+
+        self.run_command("--chunk-size", "2")
+
+        self.assertEqual(len(self.bot.sent), 5)
+        with open(self.checkpoint) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.assertTrue(checkpoint["done"])
+        self.assertEqual(checkpoint["failed"], [])
@@ -0,0 +1,135 @@
+import json
+import os
+import pstats
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowing.models import Borrowing
+from library.profiling import DiskRing
+
+
+class DiagnosticsTestMixin:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.admin_user = get_user_model().objects.create_superuser(email="admin@example.com", password="password")
+        self.reader = get_user_model().objects.create_user(email="reader@example.com", password="password")
+        book = Book.objects.create(title="Slow Book", author="Author", cover="HARD", inventory=1, daily_fee=1.00)
+        Borrowing.objects.create(
+            borrow_date=timezone.now().date(),
+            expected_return_date=timezone.now().date() + timezone.timedelta(days=7),
+            book_id=book,
+            user_id=self.reader
+        )
+        self.list_url = reverse("borrowing:borrowing-list")
+
+    def get_as(self, user, *args, **extra):
+        return self.client.get(self.list_url, *args, HTTP_AUTHORIZE=f"Bearer {AccessToken.for_user(user)}", **extra)
+
+    def files(self):
+        return sorted(os.listdir(self.tmpdir.name))
+
+
+class ProfilingMiddlewareTest(DiagnosticsTestMixin, APITestCase):
+    def test_profiling_is_off_by_default(self):
+        response = self.get_as(self.admin_user, HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_staff_request_is_profiled(self):
+        with override_settings(PROFILING_ENABLED=True, PROFILE_DIR=self.tmpdir.name):
+            response = self.get_as(self.admin_user, {"profile": "1"})
+
+        profile_id = response["X-Profile-Id"]
+        self.assertEqual(self.files(), [f"{profile_id}.prof", f"{profile_id}.txt"])
+
+        with open(os.path.join(self.tmpdir.name, f"{profile_id}.txt")) as summary:
+            self.assertIn("borrowing:borrowing-list", summary.readline())
+        stats = pstats.Stats(os.path.join(self.tmpdir.name, f"{profile_id}.prof"))
+        self.assertGreater(stats.total_calls, 0)
+
+    def test_non_staff_request_is_not_profiled(self):
+        with override_settings(PROFILING_ENABLED=True, PROFILE_DIR=self.tmpdir.name):
+            response = self.get_as(self.reader, HTTP_X_PROFILE="1")
+            anonymous = self.client.get(self.list_url, HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(anonymous.status_code, 401)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(self.files(), [])
+
+    def test_profiles_are_kept_in_a_bounded_ring(self):
+        with override_settings(PROFILING_ENABLED=True, PROFILE_DIR=self.tmpdir.name, PROFILE_KEEP=2):
+            profile_ids = [self.get_as(self.admin_user, HTTP_X_PROFILE="1")["X-Profile-Id"] for _ in range(3)]
+
+        self.assertEqual(
+            self.files(),
+            [f"{profile_id}{suffix}" for profile_id in profile_ids[1:] for suffix in (".prof", ".txt")]
+        )
+
+
+class SlowQueryMiddlewareTest(DiagnosticsTestMixin, APITestCase):
+    def entries(self):
+        entries = []
+        for name in self.files():
+            with open(os.path.join(self.tmpdir.name, name)) as entry:
+                entries.append(json.load(entry))
+        return entries
+
+    def test_disabled_by_default(self):
+        with override_settings(SLOW_QUERY_DIR=self.tmpdir.name):
+            self.get_as(self.reader)
+
+        self.assertEqual(self.files(), [])
+
+    def test_slow_queries_are_logged_with_plan_and_origin(self):
+        with override_settings(SLOW_QUERY_MS=0.000001, SLOW_QUERY_DIR=self.tmpdir.name):
+            self.get_as(self.reader)
+
+        entries = self.entries()
+        borrowing_query = next(entry for entry in entries if 'FROM "borrowing_borrowing"' in entry["sql"])
+
+        self.assertEqual(borrowing_query["view"], "borrowing:borrowing-list")
+        self.assertTrue(borrowing_query["plan"])
+        self.assertTrue(borrowing_query["origin"])
+        self.assertFalse(any(entry["sql"].startswith("EXPLAIN") for entry in entries))
+
+    def test_parameters_are_not_logged(self):
+        with override_settings(SLOW_QUERY_MS=0.000001, SLOW_QUERY_DIR=self.tmpdir.name):
+            self.client.post(
+                reverse("user:token_obtain_pair"),
+                {"email": "secret-login@example.com", "password": "password"}
+            )
+
+        logged = json.dumps(self.entries())
+
+        self.assertIn("user_user", logged)
+        self.assertNotIn("secret-login", logged)
+
+    def test_slow_query_log_is_bounded(self):
+        with override_settings(SLOW_QUERY_MS=0.000001, SLOW_QUERY_DIR=self.tmpdir.name, SLOW_QUERY_KEEP=1):
+            self.get_as(self.reader)
+
+        self.assertEqual(len(self.files()), 1)
+
+
+class DiskRingTest(APITestCase):
+    def test_oldest_entries_are_dropped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ring = DiskRing(directory, size=2)
+            first = ring.write({".txt": "one"})
+            ring.write({".txt": "two", ".bin": b"2"})
+            ring.write({".txt": "three"})
+
+            names = os.listdir(directory)
+
+        self.assertEqual(len(names), 3)
+        self.assertFalse(any(name.startswith(first) for name in names))
@@ -0,0 +1,207 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from books.views import BookViewSet
+from borrowing.models import Borrowing
+from borrowing.views import BorrowingViewSet
+from rest_framework_simplejwt.tokens import AccessToken
+from library.routers import (
+    STICKY_COOKIE,
+    ReplicaRouter,
+    bind_to_read_database,
+    ReplicaRoutingMiddleware,
+    use_primary,
+    use_replica,
+)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], REPLICA_STICKY_SECONDS=5)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_primary_by_default(self):
+        self.assertIsNone(self.router.db_for_read(Book))
+
+    def test_use_replica_and_use_primary(self):
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Book), "replica_1")
+            with use_primary():
+                self.assertIsNone(self.router.db_for_read(Book))
+            self.assertEqual(self.router.db_for_read(Book), "replica_1")
+
+    def test_writes_always_go_to_primary(self):
+        with use_replica():
+            self.assertEqual(self.router.db_for_write(Book), "default")
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica_1", "books"))
+        self.assertIsNone(self.router.allow_migrate("default", "books"))
+
+    def test_querysets_can_be_bound_for_streaming(self):
+        with use_replica():
+            queryset = bind_to_read_database(Borrowing.objects.all())
+
+        self.assertEqual(queryset.db, "replica_1")
+        self.assertEqual(bind_to_read_database(Borrowing.objects.all()).db, "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_primary(self):
+        with use_replica():
+            self.assertIsNone(self.router.db_for_read(Book))
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def bearer(self, user_id):
+        token = AccessToken()
+        token["user_id"] = user_id
+        return {"HTTP_AUTHORIZE": f"Bearer {token}"}
+
+    def run_request(self, request, view_func, write=False):
+        """Run request through the middleware the way Django's handler does."""
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view_func, (), {})
+            seen["read"] = self.router.db_for_read(Borrowing)
+            if write:
+                self.router.db_for_write(Borrowing)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+
+        return seen["read"], response
+
+    def test_safe_request_on_opted_in_action_reads_from_replica(self):
+        read, response = self.run_request(
+            self.factory.get("/"), BorrowingViewSet.as_view({"get": "list"})
+        )
+
+        self.assertEqual(read, "replica_1")
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+    def test_viewset_can_opt_in_every_action(self):
+        read, _ = self.run_request(self.factory.get("/"), BookViewSet.as_view({"get": "retrieve"}))
+
+        self.assertEqual(read, "replica_1")
+
+    def test_other_actions_read_from_primary(self):
+        read, _ = self.run_request(
+            self.factory.get("/"), BorrowingViewSet.as_view({"get": "return_borrowing"})
+        )
+
+        self.assertIsNone(read)
+
+    def test_writes_read_from_primary_and_set_sticky_cookie(self):
+        read, response = self.run_request(
+            self.factory.post("/"), BorrowingViewSet.as_view({"post": "create"}), write=True
+        )
+
+        self.assertIsNone(read)
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 5)
+
+    def test_safe_request_that_writes_sets_sticky_cookie(self):
+        _, response = self.run_request(
+            self.factory.get("/"), BorrowingViewSet.as_view({"get": "return_borrowing"}), write=True
+        )
+
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[STICKY_COOKIE] = "1"
+
+        read, _ = self.run_request(request, BorrowingViewSet.as_view({"get": "list"}))
+
+        self.assertIsNone(read)
+
+    def test_state_does_not_leak_past_the_request(self):
+        self.run_request(self.factory.get("/"), BorrowingViewSet.as_view({"get": "list"}))
+
+        self.assertIsNone(self.router.db_for_read(Borrowing))
+
+    def test_token_clients_read_their_writes_without_cookies(self):
+        self.run_request(
+            self.factory.post("/", **self.bearer(7)),
+            BorrowingViewSet.as_view({"post": "create"}),
+            write=True
+        )
+        list_view = BorrowingViewSet.as_view({"get": "list"})
+
+        own_read, _ = self.run_request(self.factory.get("/", **self.bearer(7)), list_view)
+        other_read, _ = self.run_request(self.factory.get("/", **self.bearer(8)), list_view)
+
+        self.assertIsNone(own_read)
+        self.assertEqual(other_read, "replica_1")
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], REPLICA_STICKY_SECONDS=5)
+class ReplicaQueriesTest(APITestCase):
+    """Requests against a real replica connection.
+
+    In tests replica_1 mirrors the test database on its own connection, so
+    it does not see rows written inside the test's transaction: what
+    matters here is which connection the queries ran on.
+    """
+
+    databases = {"default", "replica_1"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        book = Book.objects.create(title="Test Book", author="Author", cover="HARD", inventory=1, daily_fee=5.00)
+        Borrowing.objects.create(
+            borrow_date=timezone.now().date(),
+            expected_return_date=(timezone.now() + timezone.timedelta(days=7)).date(),
+            book_id=book,
+            user_id=self.user
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections["replica_1"]) as replica:
+                response = self.client.get(url, params)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+
+        return response, primary, replica
+
+    def assertReadFromReplica(self, primary, replica):
+        self.assertTrue(any("borrowing_borrowing" in query["sql"] for query in replica))
+        self.assertFalse(any("borrowing_borrowing" in query["sql"] for query in primary))
+
+    def test_list_reads_from_the_replica(self):
+        response, primary, replica = self.get(reverse("borrowing:borrowing-list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertReadFromReplica(primary, replica)
+
+    def test_streamed_export_reads_from_the_replica(self):
+        response, primary, replica = self.get(reverse("borrowing:borrowing-export"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertReadFromReplica(primary, replica)
+
+    def test_reads_after_a_write_use_the_primary(self):
+        self.client.cookies[STICKY_COOKIE] = "1"
+
+        response, primary, replica = self.get(reverse("borrowing:borrowing-list"))
+
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(len(replica), 0)
@@ -1,21 +1,54 @@
-from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import viewsets, permissions, status
+from itertools import chain
+
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from borrowing.export import EXPORT_FORMATS, export_lines
+from borrowing.filters import filter_borrowings
+from borrowing.fines import fine_totals, fines_by_borrowing, fines_by_user
+from books.serializers import BookSerializer
 from borrowing.models import Borrowing
+from library.conditional import ConditionalGetMixin
+from library.fastlist import FastListMixin
+from library.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetMixin
+from library.pagination import BorrowingPagination, UserGroupPagination
+from library.routers import bind_to_read_database
+from library.streaming import (
+    STREAM_CHUNK_SIZE,
+    csv_response,
+    ndjson_lines,
+    ndjson_response,
+)
 from borrowing.serializers import (
     BorrowingSerializer,
     BorrowingListSerializer,
     BorrowingCreateSerializer,
-    BorrowingReturnSerializer
+    BorrowingReturnSerializer,
+    BorrowingBulkCreateSerializer,
+    BorrowingBulkReturnSerializer,
+    BorrowingFineSerializer,
+    UserFineSerializer,
+    FineTotalsSerializer
 )
 
 
-class BorrowingViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=FIELDSET_PARAMETERS),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS),
+)
+class BorrowingViewSet(
+    ConditionalGetMixin,
+    SparseFieldsetMixin,
+    FastListMixin,
+    viewsets.ModelViewSet
+):
     queryset = Borrowing.objects.all()
     serializer_class = BorrowingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BorrowingPagination
+    read_from_replica = ("list", "retrieve", "fines", "export")
 
     @extend_schema(
         parameters=[
@@ -31,6 +64,18 @@ class BorrowingViewSet(viewsets.ModelViewSet):
                 required=False,
                 type=bool
             ),
+            OpenApiParameter(
+                name="borrowed_after",
+                description="Only borrowings made on or after this date (YYYY-MM-DD)",
+                required=False,
+                type=str
+            ),
+            OpenApiParameter(
+                name="borrowed_before",
+                description="Only borrowings made on or before this date (YYYY-MM-DD)",
+                required=False,
+                type=str
+            ),
         ],
         responses={200: BorrowingListSerializer},
     )
@@ -41,17 +86,22 @@ class BorrowingViewSet(viewsets.ModelViewSet):
             if user_id:
                 queryset = Borrowing.objects.filter(user_id=user_id)
         else:
-            queryset = Borrowing.objects.filter(user_id=self.request.user)
+            queryset = Borrowing.objects.filter(user_id=self.request.user.id)
+
+        queryset = filter_borrowings(queryset, self.request.query_params)
+
+        if self.action == "list":
+            queryset = queryset.select_related("book_id")
 
-        is_active = self.request.query_params.get("is_active")
+        return self.project_queryset(queryset)
 
-        if is_active is not None:
-            if is_active.lower() == "true":
-                queryset = queryset.filter(actual_return_date__isnull=True)
-            elif is_active.lower() == "false":
-                queryset = queryset.filter(actual_return_date__isnull=False)
+    def get_modified_fields(self):
+        fields = super().get_modified_fields()
 
-        return queryset
+        if isinstance(self.get_serializer().fields.get("book_id"), BookSerializer):
+            fields.append("book_id__updated_at")
+
+        return fields
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -78,3 +128,151 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         serializer.save()
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        description=(
+            "Borrow several books at once. In partial mode available books are "
+            "borrowed and the rest reported as failed; in atomic mode nothing "
+            "is borrowed unless every book is available."
+        ),
+        request=BorrowingBulkCreateSerializer,
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+        serializer_class=BorrowingBulkCreateSerializer
+    )
+    def bulk_borrow(self, request):
+        serializer = BorrowingBulkCreateSerializer(
+            data=request.data,
+            context=self.get_serializer_context()
+        )
+
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        statuses = {result["status"] for result in results}
+        if statuses == {"created"}:
+            response_status = status.HTTP_201_CREATED
+        elif "created" in statuses:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response({"results": results}, status=response_status)
+
+    @extend_schema(
+        description=(
+            "Return several borrowings at once and restore book inventory. "
+            "Already returned and unknown ids are reported, not rejected."
+        ),
+        request=BorrowingBulkReturnSerializer,
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk_return",
+        serializer_class=BorrowingBulkReturnSerializer
+    )
+    def bulk_return(self, request):
+        serializer = BorrowingBulkReturnSerializer(
+            data=request.data,
+            context={"queryset": self.get_queryset()}
+        )
+
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+
+        return Response(result, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        description=(
+            "Overdue fines (daily fee x days overdue), grouped per user or per "
+            "borrowing, with totals. Active borrowings accrue fines up to today. "
+            "Accepts the user_id and is_active filters (admin only)."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="group_by",
+                description="Group fines by user (default) or borrowing",
+                required=False,
+                enum=["user", "borrowing"]
+            ),
+            OpenApiParameter(
+                name="stream",
+                description="Set to ndjson to stream every row instead of paginating",
+                required=False,
+                enum=["ndjson"]
+            ),
+        ],
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[permissions.IsAdminUser]
+    )
+    def fines(self, request):
+        queryset = self.get_queryset()
+        group_by = request.query_params.get("group_by", "user")
+
+        if group_by == "user":
+            rows = fines_by_user(queryset)
+            serializer_class = UserFineSerializer
+            paginator = UserGroupPagination()
+        elif group_by == "borrowing":
+            rows = fines_by_borrowing(queryset)
+            serializer_class = BorrowingFineSerializer
+            paginator = BorrowingPagination()
+        else:
+            raise serializers.ValidationError(
+                {"group_by": "Must be either user or borrowing"}
+            )
+
+        totals = FineTotalsSerializer(fine_totals(queryset)).data
+
+        if request.query_params.get("stream") == "ndjson":
+            lines = ndjson_lines(
+                bind_to_read_database(rows).iterator(chunk_size=STREAM_CHUNK_SIZE),
+                serializer_class().to_representation
+            )
+            return ndjson_response(chain(lines, ndjson_lines([{"totals": totals}])))
+
+        page = paginator.paginate_queryset(rows, request, view=self)
+        response = paginator.get_paginated_response(
+            serializer_class(page, many=True).data
+        )
+        response.data["totals"] = totals
+
+        return response
+
+    @extend_schema(
+        description=(
+            "Stream the borrowing history as CSV or NDJSON. Accepts the same "
+            "filters as the list."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="file_format",
+                description="csv (default) or ndjson",
+                required=False,
+                enum=list(EXPORT_FORMATS)
+            ),
+        ],
+    )
+    @action(methods=["GET"], detail=False)
+    def export(self, request):
+        file_format = request.query_params.get("file_format", "csv")
+
+        if file_format not in EXPORT_FORMATS:
+            raise serializers.ValidationError(
+                {"file_format": f"Must be one of: {', '.join(EXPORT_FORMATS)}"}
+            )
+
+        lines = export_lines(bind_to_read_database(self.get_queryset()), file_format)
+        filename = f"borrowings.{file_format}"
+
+        if file_format == "csv":
+            return csv_response(lines, filename)
+
+        return ndjson_response(lines, filename)
@@ -0,0 +1,81 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """Answer If-None-Match / If-Modified-Since on list and retrieve.
+
+    Validators come from get_modification_state(), which must be cheap and
+    must not serialize anything, so a 304 costs at most one small query.
+    """
+
+    def get_modified_fields(self):
+        """Timestamp fields whose latest value dates the response.
+
+        Views that serialize related rows add their timestamps here, e.g.
+        "book_id__updated_at", so changes to them are revalidated too.
+        """
+        return ["updated_at"]
+
+    def get_modification_state(self):
+        """Return a (token, last_modified) pair for the requested resource.
+
+        The default aggregates the filtered queryset; the row count makes
+        deletions change the token even when no timestamp moves.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+
+        fields = self.get_modified_fields()
+        state = queryset.aggregate(
+            *(Max(field) for field in fields),
+            count=Count("pk")
+        )
+        timestamps = [state[f"{field}__max"] for field in fields]
+        last_modified = max(filter(None, timestamps), default=None)
+        token = ":".join(
+            [str(state["count"])]
+            + [timestamp.isoformat() if timestamp else "" for timestamp in timestamps]
+        )
+
+        return token, last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        token, last_modified = self.get_modification_state()
+        etag = quote_etag(
+            hashlib.sha1(
+                f"{request.user.pk}|{request.get_full_path()}|"
+                f"{request.accepted_media_type}|{token}".encode()
+            ).hexdigest()
+        )
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=timestamp
+        )
+
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
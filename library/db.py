@@ -0,0 +1,93 @@
+import logging
+import os
+import time
+
+from django.db import connections
+from django.db.utils import OperationalError
+
+logger = logging.getLogger(__name__)
+
+
+def pools():
+    """Yield (alias, pool) for every connection configured with a pool."""
+    for connection in connections.all():
+        if connection.settings_dict["OPTIONS"].get("pool"):
+            yield connection.alias, connection.pool
+
+
+def wait_for_database(alias="default", timeout=60, initial_delay=0.5, max_delay=10, on_retry=None):
+    """Block until alias accepts queries, backing off exponentially.
+
+    on_retry(error, delay) is called before each sleep. Raises the last
+    OperationalError once timeout seconds have passed.
+    """
+    connection = connections[alias]
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+
+    while True:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return
+        except OperationalError as error:
+            connection.close()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            delay = min(delay, max_delay, remaining)
+            if on_retry is not None:
+                on_retry(error, delay)
+            time.sleep(delay)
+            delay *= 2
+
+
+def warm_pools(timeout=30):
+    """Open every pool and wait until it holds min_size connections.
+
+    Returns {alias: pool stats}.
+    """
+    stats = {}
+
+    for alias, pool in pools():
+        pool.open(wait=True, timeout=timeout)
+        stats[alias] = pool.get_stats()
+
+    return stats
+
+
+def warm_pools_on_startup(timeout=10):
+    """warm_pools() for server processes, called before they take traffic.
+
+    A database that is not up yet is logged rather than fatal; the pool
+    keeps connecting in the background.
+    """
+    if not any(pools()):
+        return
+
+    from psycopg_pool import PoolTimeout
+
+    try:
+        warm_pools(timeout=timeout)
+    except PoolTimeout:
+        logger.warning("Connection pool not filled after %ss, continuing", timeout)
+
+
+_warmed_pid = None
+
+
+def warm_pools_once(**kwargs):
+    """request_started receiver running warm_pools_on_startup() per process.
+
+    Warming at import would open the pools in whichever process loads the
+    app; with gunicorn --preload or a uWSGI master, forked workers would
+    then inherit shared sockets and pool threads that no longer run. Each
+    worker warms its own pools on its first request instead.
+    """
+    global _warmed_pid
+
+    if _warmed_pid == os.getpid():
+        return
+
+    _warmed_pid = os.getpid()
+    warm_pools_on_startup()
@@ -0,0 +1,238 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        name=FIELDS_PARAM,
+        description=(
+            "Comma-separated fields to return; nested fields as book_id.inventory"
+        ),
+        required=False,
+        type=str
+    ),
+    OpenApiParameter(
+        name=OMIT_PARAM,
+        description="Comma-separated fields to leave out, same syntax as fields",
+        required=False,
+        type=str
+    ),
+]
+
+
+def parse_paths(value):
+    """Turn "id,book_id.title" into {"id": None, "book_id": {"title": None}}.
+
+    None stands for the whole field, which wins over any of its subfields.
+    """
+    tree = {}
+
+    for path in value.split(","):
+        names = [name.strip() for name in path.split(".")]
+        if not all(names):
+            continue
+
+        node = tree
+        for name in names[:-1]:
+            if name in node and node[name] is None:
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = None
+
+    return tree
+
+
+class Fieldset:
+    """The fields requested for one serializer level.
+
+    include is None when every field is wanted; omit lists fields to drop,
+    again with None for the whole field.
+    """
+
+    def __init__(self, include=None, omit=None, prefix=""):
+        self.include = include
+        self.omit = omit or {}
+        self.prefix = prefix
+
+    @classmethod
+    def from_query_params(cls, query_params):
+        """Return the requested Fieldset, or None if nothing was requested."""
+        fields = query_params.get(FIELDS_PARAM)
+        omit = query_params.get(OMIT_PARAM)
+
+        if fields is None and omit is None:
+            return None
+
+        return cls(
+            parse_paths(fields) if fields is not None else None,
+            parse_paths(omit) if omit is not None else None
+        )
+
+    def check(self, param, tree, fields):
+        unknown = [name for name in tree if name not in fields]
+
+        if unknown:
+            raise serializers.ValidationError({
+                param: f"Unknown fields: {', '.join(self.prefix + name for name in unknown)}"
+            })
+
+        for name, subtree in tree.items():
+            if subtree is not None and not isinstance(
+                nested_serializer(fields[name]), FieldsetSerializerMixin
+            ):
+                raise serializers.ValidationError(
+                    {param: f"{self.prefix + name} has no subfields"}
+                )
+
+    def select(self, fields):
+        """Drop the unwanted entries of a serializer's fields dict."""
+        if self.include is not None:
+            self.check(FIELDS_PARAM, self.include, fields)
+        self.check(OMIT_PARAM, self.omit, fields)
+
+        for name in list(fields):
+            dropped = self.include is not None and name not in self.include
+            if dropped or (name in self.omit and self.omit[name] is None):
+                del fields[name]
+
+        return fields
+
+    def nested(self, name):
+        return Fieldset(
+            self.include.get(name) if self.include is not None else None,
+            self.omit.get(name),
+            f"{self.prefix}{name}."
+        )
+
+
+def nested_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+class FieldsetSerializerMixin:
+    """Only build the fields requested with ?fields= and ?omit=.
+
+    The top-level serializer reads the Fieldset from the "fieldset" context
+    entry and hands each nested serializer its part of it.
+    """
+
+    fieldset = None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.fieldset
+
+        if fieldset is None and self.is_top_level:
+            fieldset = self.context.get("fieldset")
+        if fieldset is None:
+            return fields
+
+        fields = fieldset.select(fields)
+
+        for name, field in fields.items():
+            nested = nested_serializer(field)
+            if isinstance(nested, FieldsetSerializerMixin):
+                nested.fieldset = fieldset.nested(name)
+
+        return fields
+
+    @property
+    def is_top_level(self):
+        root = self.root
+        return root is self or getattr(root, "child", None) is self
+
+
+def projection(serializer):
+    """Return (only, related) covering every field serializer will read.
+
+    Returns None when a field cannot be mapped to a concrete column, such
+    as method fields, dotted sources or to-many relations, in which case
+    the queryset has to load everything.
+    """
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is None:
+        return None
+
+    only = []
+    related = []
+
+    for field in serializer.fields.values():
+        source = field.source
+        if source == "*" or "." in source:
+            return None
+
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete or model_field.many_to_many:
+            return None
+
+        if isinstance(field, serializers.ListSerializer):
+            return None
+        if isinstance(field, serializers.BaseSerializer):
+            nested = projection(field)
+            if nested is None:
+                return None
+            only.append(source)
+            related.append(source)
+            related.extend(f"{source}__{name}" for name in nested[1])
+            only.extend(f"{source}__{name}" for name in nested[0])
+        else:
+            only.append(source)
+
+    return only, related
+
+
+class SparseFieldsetMixin:
+    """Let list and retrieve clients pick fields with ?fields= and ?omit=.
+
+    The serializer must use FieldsetSerializerMixin. Views call
+    project_queryset() at the end of get_queryset() so that only the
+    selected columns are loaded and only the selected relations joined.
+    """
+
+    fieldset_actions = ("list", "retrieve")
+
+    @cached_property
+    def fieldset(self):
+        if self.action not in self.fieldset_actions:
+            return None
+
+        return Fieldset.from_query_params(self.request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fieldset"] = self.fieldset
+        return context
+
+    def project_queryset(self, queryset):
+        """Replace the queryset's joins and columns with the projection.
+
+        Relations joined by get_queryset() that the selection no longer
+        needs are dropped too.
+        """
+        if self.fieldset is None:
+            return queryset
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        selected = projection(serializer)
+
+        if selected is None:
+            return queryset
+
+        only, related = selected
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+
+        return queryset.only(*only)
@@ -0,0 +1,231 @@
+import os
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from library.db import pools
+from library.middleware import HybridMiddleware
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported), every
+# worker process writes its samples to files in that directory and the
+# metrics view merges them, so any worker can answer a scrape.
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request",
+    ["method", "view", "status"]
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries executed per request",
+    ["method", "view"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in the database per request",
+    ["method", "view"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of non-streaming response bodies",
+    ["method", "view"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+TELEGRAM_SENDS = Counter(
+    "telegram_messages_total",
+    "Outbound Telegram send attempts by outcome",
+    ["outcome"]
+)
+TELEGRAM_LATENCY = Histogram(
+    "telegram_send_duration_seconds",
+    "Time spent in a single Telegram send call"
+)
+
+
+class PoolCollector:
+    """Report this process's database connection pool stats at scrape time.
+
+    In multiprocess mode the numbers come from whichever worker answers
+    the scrape.
+    """
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "db_pool_connections",
+            "Connections held by the pool",
+            labels=["database", "state"]
+        )
+        waiting = GaugeMetricFamily(
+            "db_pool_requests_waiting",
+            "Requests currently waiting for a connection",
+            labels=["database"]
+        )
+        requests = CounterMetricFamily(
+            "db_pool_requests",
+            "Connections handed out by the pool",
+            labels=["database"]
+        )
+        wait_time = CounterMetricFamily(
+            "db_pool_wait_seconds",
+            "Time requests spent waiting for a connection",
+            labels=["database"]
+        )
+        errors = CounterMetricFamily(
+            "db_pool_errors",
+            "Requests that timed out or failed waiting for a connection",
+            labels=["database"]
+        )
+
+        for alias, pool in pools():
+            stats = pool.get_stats()
+            size = stats.get("pool_size", 0)
+            available = stats.get("pool_available", 0)
+
+            connections.add_metric([alias, "in_use"], size - available)
+            connections.add_metric([alias, "idle"], available)
+            waiting.add_metric([alias], stats.get("requests_waiting", 0))
+            requests.add_metric([alias], stats.get("requests_num", 0))
+            wait_time.add_metric([alias], stats.get("requests_wait_ms", 0) / 1000)
+            errors.add_metric([alias], stats.get("requests_errors", 0))
+
+        yield from (connections, waiting, requests, wait_time, errors)
+
+
+REGISTRY.register(PoolCollector())
+
+
+class QueryRecorder:
+    """Execute wrapper that counts queries and sums their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def install_wrapper(stack, wrapper):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+@contextmanager
+def record_queries(wrapper):
+    """Install an execute wrapper on every database connection."""
+    with ExitStack() as stack:
+        install_wrapper(stack, wrapper)
+        yield
+
+
+@asynccontextmanager
+async def arecord_queries(wrapper):
+    """record_queries for async requests.
+
+    Connections are per thread and the async ORM runs its queries on the
+    request's sync thread, so the wrapper is installed there rather than
+    on the event loop thread.
+    """
+    stack = ExitStack()
+    await sync_to_async(install_wrapper)(stack, wrapper)
+    try:
+        yield
+    finally:
+        await sync_to_async(stack.close)()
+
+
+def view_label(request):
+    """Label requests by URL name rather than path to keep cardinality low."""
+    match = getattr(request, "resolver_match", None)
+
+    if match is None:
+        return "unmatched"
+
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """Record latency, database work and response size for every request.
+
+    Place it first in MIDDLEWARE so the timings cover the whole stack.
+    """
+
+    def handle(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+
+        with record_queries(recorder):
+            response = self.get_response(request)
+
+        self.observe(request, response, time.perf_counter() - start, recorder)
+        return response
+
+    async def ahandle(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+
+        async with arecord_queries(recorder):
+            response = await self.get_response(request)
+
+        self.observe(request, response, time.perf_counter() - start, recorder)
+        return response
+
+    def observe(self, request, response, duration, recorder):
+        method = request.method
+        view = view_label(request)
+
+        REQUEST_LATENCY.labels(method, view, response.status_code).observe(duration)
+        REQUEST_QUERIES.labels(method, view).observe(recorder.count)
+        REQUEST_DB_TIME.labels(method, view).observe(recorder.duration)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(method, view).observe(len(response.content))
+
+
+def metrics_allowed(request):
+    """Scrapers send METRICS_TOKEN as a bearer token; staff users may look too."""
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+
+    if token and constant_time_compare(authorization, f"Bearer {token}"):
+        return True
+
+    from library.profiling import is_staff_request
+
+    return is_staff_request(request)
+
+
+def metrics_view(request):
+    """Expose the collected metrics in the Prometheus text format."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+
+    if os.environ.get(MULTIPROCESS_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(PoolCollector())
+    else:
+        registry = REGISTRY
+
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
+class HybridMiddleware(ABC):
+    """Base for middleware that runs natively under both WSGI and ASGI.
+
+    Django puts sync-only middleware on a thread in front of async views,
+    which would undo the point of serving them from ASGI. Subclasses
+    implement handle() for sync requests and ahandle() for async ones.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    @abstractmethod
+    def handle(self, request):
+        """Process a request in a sync stack and return its response."""
+
+    @abstractmethod
+    async def ahandle(self, request):
+        """Process a request in an async stack and return its response."""
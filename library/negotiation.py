@@ -0,0 +1,41 @@
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.utils.mediatypes import _MediaType
+
+
+def names_renderer(accepted, renderer):
+    """Whether an Accept entry asks for renderer by its media type parameters."""
+    offered = _MediaType(renderer.media_type)
+    wanted = _MediaType(accepted)
+
+    return (
+        bool(offered.params)
+        and (wanted.main_type, wanted.sub_type) == (offered.main_type, offered.sub_type)
+        and offered.match(wanted)
+    )
+
+
+class ParameterContentNegotiation(DefaultContentNegotiation):
+    """Select renderers whose media type carries parameters.
+
+    DRF only picks such a renderer when the Accept header repeats the
+    parameters, so "?format=orjson" with the usual "*/*" is refused and
+    the plain renderer of the same type would win if listed first. Here
+    an explicit format or an Accept entry with the parameters selects the
+    renderer directly, and everything else negotiates as before, so the
+    first renderer in the list stays the default.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        format = format_suffix or request.query_params.get(self.settings.URL_FORMAT_OVERRIDE)
+
+        if format:
+            selected = self.filter_renderers(renderers, format)
+            if len(selected) == 1 and _MediaType(selected[0].media_type).params:
+                return selected[0], selected[0].media_type
+
+        for accepted in self.get_accept_list(request):
+            for renderer in renderers:
+                if names_renderer(accepted, renderer):
+                    return renderer, renderer.media_type
+
+        return super().select_renderer(request, renderers, format_suffix)
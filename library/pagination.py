@@ -0,0 +1,88 @@
+from django.conf import settings
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    LimitOffsetPagination,
+)
+from rest_framework.request import Request
+
+
+class KeysetPagination(CursorPagination):
+    """Opaque cursor pagination over a unique, indexed key.
+
+    Pages seek past the last seen key instead of using OFFSET, so a deep
+    page costs the same as the first one.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class AsyncKeysetPagination(KeysetPagination):
+    """Keyset pagination over "id" for async views.
+
+    Reads and writes the same cursors as KeysetPagination, so links can be
+    followed on either endpoint, but the page is fetched with aiterator().
+    """
+
+    async def apaginate_queryset(self, queryset, request):
+        request = Request(request)
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        position = cursor.position if cursor else None
+        self.reverse = bool(cursor and cursor.reverse)
+
+        if self.reverse:
+            queryset = queryset.order_by("-id")
+            if position is not None:
+                queryset = queryset.filter(id__lt=position)
+        else:
+            queryset = queryset.order_by("id")
+            if position is not None:
+                queryset = queryset.filter(id__gt=position)
+
+        rows = [row async for row in queryset[:self.page_size + 1].aiterator()]
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+
+        if self.reverse:
+            page.reverse()
+            self.has_previous, self.has_next = has_more, position is not None
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+
+        self.page = page
+        return page
+
+    def get_paginated_data(self, data):
+        next_link = previous_link = None
+
+        if self.page and self.has_next:
+            next_link = self.encode_cursor(Cursor(0, False, self.page[-1].id))
+        if self.page and self.has_previous:
+            previous_link = self.encode_cursor(Cursor(0, True, self.page[0].id))
+
+        return {"next": next_link, "previous": previous_link, "results": data}
+
+
+class BorrowingPagination(KeysetPagination):
+    ordering = "-id"
+
+
+class UserGroupPagination(KeysetPagination):
+    """Keyset pagination for rows grouped by user."""
+
+    ordering = "user_id"
+
+
+class RankedPagination(LimitOffsetPagination):
+    """Pagination for relevance-ordered results, which have no stable key.
+
+    Used for search, where clients read the first few pages of the best
+    matches rather than walking the whole result set.
+    """
+
+    default_limit = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    max_limit = settings.API_MAX_PAGE_SIZE
@@ -0,0 +1,18 @@
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from library.renderers import MSGPACK_MEDIA_TYPE, MessagePackRenderer
+
+
+class MessagePackParser(BaseParser):
+    """Parse MessagePack request bodies into the same data as JSON ones."""
+
+    media_type = MSGPACK_MEDIA_TYPE
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -0,0 +1,286 @@
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import re
+import time
+import traceback
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import AuthenticationFailed
+
+from library import metrics
+from library.metrics import arecord_queries, record_queries, view_label
+from library.middleware import HybridMiddleware
+from user.authentication import ClaimsJWTAuthentication
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_STATS_LINES = 40
+ORIGIN_FRAMES = 5
+
+# Frames from these files are never reported as the origin of a query.
+INTERNAL_FILES = {__file__, metrics.__file__}
+
+# Quoted literals in a plan are bound parameter values.
+PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+class DiskRing:
+    """A directory that keeps only the newest ``size`` entries.
+
+    An entry is one or more files sharing a time-ordered id, so a profile
+    and its summary are kept or dropped together. Files are written under a
+    temporary name and renamed, so readers never see partial output.
+    """
+
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.size = size
+
+    def write(self, files):
+        """Store {suffix: text or bytes} as one entry and return its id."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+
+        for suffix, content in files.items():
+            path = os.path.join(self.directory, f"{entry_id}{suffix}")
+            mode = "wb" if isinstance(content, bytes) else "w"
+            with open(f"{path}.tmp", mode) as file:
+                file.write(content)
+            os.replace(f"{path}.tmp", path)
+
+        self.prune()
+
+        return entry_id
+
+    def entries(self):
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if not name.endswith(".tmp")
+        )
+        entries = {}
+        for name in names:
+            entries.setdefault(name.split(".", 1)[0], []).append(name)
+        return entries
+
+    def prune(self):
+        entries = self.entries()
+        for entry_id in sorted(entries)[:max(len(entries) - self.size, 0)]:
+            for name in entries[entry_id]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+def request_user(request):
+    """Resolve the caller before DRF has authenticated the request.
+
+    Admin sessions are already on request.user; API clients are identified
+    from their access token.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+
+    return result[0] if result else None
+
+
+def profiling_flag_set(request):
+    return settings.PROFILING_ENABLED and bool(
+        request.META.get(PROFILE_HEADER) or PROFILE_QUERY_PARAM in request.GET
+    )
+
+
+def is_staff_request(request):
+    user = request_user(request)
+    return user is not None and user.is_staff
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    """Run a staff request under cProfile when asked to.
+
+    Needs PROFILING_ENABLED, a staff user and either the X-Profile header or
+    a ``?profile`` flag. The raw stats and a text summary go to PROFILE_DIR
+    and the response carries their id in X-Profile-Id. Async requests only
+    profile the event loop thread, not ORM calls handed to worker threads.
+    """
+
+    def handle(self, request):
+        if not (profiling_flag_set(request) and is_staff_request(request)):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        return self.save_profile(request, response, profiler, time.perf_counter() - start)
+
+    async def ahandle(self, request):
+        if not (
+            profiling_flag_set(request)
+            and await sync_to_async(is_staff_request)(request)
+        ):
+            return await self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+
+        return self.save_profile(request, response, profiler, time.perf_counter() - start)
+
+    def save_profile(self, request, response, profiler, duration):
+        summary = io.StringIO()
+        summary.write(
+            f"{request.method} {request.get_full_path()} -> {response.status_code} "
+            f"in {duration * 1000:.1f} ms ({view_label(request)})\n\n"
+        )
+        stats = pstats.Stats(profiler, stream=summary)
+        stats.sort_stats("cumulative").print_stats(PROFILE_STATS_LINES)
+
+        # .prof uses the marshal format of Stats.dump_stats, so it opens in
+        # pstats, snakeviz and similar tools.
+        ring = DiskRing(settings.PROFILE_DIR, settings.PROFILE_KEEP)
+        response["X-Profile-Id"] = ring.write({
+            ".prof": marshal.dumps(stats.stats),
+            ".txt": summary.getvalue(),
+        })
+
+        return response
+
+
+def query_origin():
+    """Return the innermost project frames as 'path:line in function'.
+
+    Several frames are kept because the innermost one is often a shared
+    helper; the view or serializer that called it follows.
+    """
+    base_dir = str(settings.BASE_DIR)
+    origin = []
+
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if (
+            filename.startswith(base_dir)
+            and "site-packages" not in filename
+            and filename not in INTERNAL_FILES
+        ):
+            relative = os.path.relpath(filename, base_dir)
+            origin.append(f"{relative}:{frame.lineno} in {frame.name}")
+            if len(origin) == ORIGIN_FRAMES:
+                break
+
+    return origin
+
+
+class SlowQueryRecorder:
+    """Execute wrapper that logs statements slower than the threshold.
+
+    Parameters are never written: they hold emails, password hashes and
+    tokens. Entries keep the parametrized SQL, and string literals in the
+    plan are masked for the same reason.
+    """
+
+    def __init__(self, request, threshold_ms, ring):
+        self.request = request
+        self.threshold_ms = threshold_ms
+        self.ring = ring
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if duration_ms >= self.threshold_ms:
+            self.record(context["connection"], sql, params, many, duration_ms)
+
+        return result
+
+    def record(self, connection, sql, params, many, duration_ms):
+        entry = {
+            "duration_ms": round(duration_ms, 3),
+            "view": view_label(self.request),
+            "path": self.request.get_full_path(),
+            "origin": query_origin(),
+            "database": connection.alias,
+            "sql": sql,
+            "plan": None if many else self.explain(connection, sql, params),
+        }
+        self.ring.write({".json": json.dumps(entry, indent=2)})
+
+    def explain(self, connection, sql, params):
+        """Return the plan of a slow SELECT, re-running it under ANALYZE.
+
+        Only reads are explained, since ANALYZE executes the statement
+        again. The savepoint keeps a failing EXPLAIN from aborting the
+        request's transaction.
+        """
+        if not sql.lstrip().upper().startswith("SELECT"):
+            return None
+
+        options = {"analyze": True} if connection.vendor == "postgresql" else {}
+        prefix = connection.ops.explain_query_prefix(**options)
+
+        self.explaining = True
+        try:
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(f"{prefix} {sql}", params)
+                    plan = "\n".join(str(row[-1]) for row in cursor.fetchall())
+                    return PLAN_LITERAL.sub("'?'", plan)
+        except DatabaseError as error:
+            return f"EXPLAIN failed: {error}"
+        finally:
+            self.explaining = False
+
+
+class SlowQueryMiddleware(HybridMiddleware):
+    """Log queries slower than SLOW_QUERY_MS to SLOW_QUERY_DIR.
+
+    Each entry holds the SQL, its plan, and the view and project frames
+    that issued it. Disabled while SLOW_QUERY_MS is 0.
+    """
+
+    def recorder(self, request):
+        return SlowQueryRecorder(
+            request,
+            settings.SLOW_QUERY_MS,
+            DiskRing(settings.SLOW_QUERY_DIR, settings.SLOW_QUERY_KEEP)
+        )
+
+    def handle(self, request):
+        if not settings.SLOW_QUERY_MS:
+            return self.get_response(request)
+
+        with record_queries(self.recorder(request)):
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        if not settings.SLOW_QUERY_MS:
+            return await self.get_response(request)
+
+        async with arecord_queries(self.recorder(request)):
+            return await self.get_response(request)
@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson, several times faster on large lists.
+
+    Selected with "Accept: application/json; engine=orjson" or
+    ?format=orjson; plain application/json still gets JSONRenderer. The
+    output matches JSONRenderer with the default compact, unicode settings:
+    dates, decimals and lazy strings go through DRF's own encoder. Indented
+    output and other JSON settings fall back to JSONRenderer.
+    """
+
+    media_type = "application/json; engine=orjson"
+    format = "orjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            self.get_indent(accepted_media_type, renderer_context)
+            or not (self.compact and self.ensure_ascii is False)
+            or self.encoder_class is not JSONEncoder
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+
+        # Same escaping JSONRenderer does for JavaScript compatibility.
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028")
+            content = content.replace(b"\xe2\x80\xa9", b"\\u2029")
+
+        return content
+
+
+def columns(rows):
+    """Turn a list of dicts with the same keys into a dict of lists."""
+    if not rows or not all(isinstance(row, dict) for row in rows):
+        return rows
+
+    keys = list(rows[0])
+    if any(len(row) != len(keys) or row.keys() != rows[0].keys() for row in rows):
+        return rows
+
+    return {key: [row[key] for row in rows] for key in keys}
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack for machine clients, with the same data as the JSON output.
+
+    Decimals are sent as strings so no precision is lost, and dates and
+    other values JSON cannot hold get their JSON representation.
+    """
+
+    media_type = MSGPACK_MEDIA_TYPE
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def __init__(self):
+        self.encoder = JSONEncoder()
+
+    def default(self, value):
+        if isinstance(value, Decimal):
+            return str(value)
+        return self.encoder.default(value)
+
+    def prepare(self, data):
+        return data
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        return msgpack.packb(self.prepare(data), default=self.default, datetime=False)
+
+
+class ColumnarMessagePackRenderer(MessagePackRenderer):
+    """MessagePack with list responses as one array per field.
+
+    Selected with "Accept: application/msgpack; layout=columns" or
+    ?format=msgpack-columns. The "results" of paginated responses are
+    converted too; smaller and faster to decode for long lists.
+    """
+
+    media_type = f"{MSGPACK_MEDIA_TYPE}; layout=columns"
+    format = "msgpack-columns"
+
+    def prepare(self, data):
+        if isinstance(data, list):
+            return columns(data)
+        if isinstance(data, dict) and isinstance(data.get("results"), list):
+            return {**data, "results": columns(data["results"])}
+        return data
@@ -0,0 +1,199 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from library.middleware import HybridMiddleware
+
+STICKY_COOKIE = "primary_reads"
+STICKY_USER_KEY = "primary_reads:{}"
+
+_routing = ContextVar("replica_routing", default=None)
+
+
+class RoutingState:
+    """Where reads of the current request or block go.
+
+    ``alias`` is the replica chosen for the whole request, so every query
+    sees the same snapshot; None means the primary. ``wrote`` is set once
+    anything is written.
+    """
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self.wrote = False
+
+
+def choose_replica():
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def use_replica():
+    """Send reads inside the block to a replica, if any are configured."""
+    replicas = settings.DATABASE_REPLICAS
+    token = _routing.set(RoutingState(choose_replica() if replicas else None))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Send reads inside the block to the primary."""
+    token = _routing.set(RoutingState())
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+def bind_to_read_database(queryset):
+    """Pin queryset to the database reads of the current context go to.
+
+    Streaming responses are iterated after the routing middleware has
+    reset its state, so querysets they consume are bound beforehand.
+    """
+    state = _routing.get()
+    alias = state.alias if state is not None else None
+
+    return queryset.using(alias or DEFAULT_DB_ALIAS)
+
+
+class ReplicaRouter:
+    """Route reads to the replica chosen for the current context.
+
+    Outside use_replica() and replica-enabled requests everything goes to
+    the primary. Writes always go to the primary, including saves of
+    objects that were read from a replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        return state.alias if state is not None else None
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def view_reads_from_replica(view_func, method):
+    """Check a view's ``read_from_replica`` attribute for this request.
+
+    The attribute is either True, for every safe request, or a collection
+    of viewset action names.
+    """
+    view = getattr(view_func, "cls", view_func)
+    allowed = getattr(view, "read_from_replica", False)
+
+    if allowed is True or not allowed:
+        return bool(allowed)
+
+    actions = getattr(view_func, "actions", None) or {}
+    return actions.get(method.lower()) in allowed
+
+
+def token_user_id(request):
+    """User id from the request's bearer token, or None.
+
+    Only the signature and expiry are checked, so this costs no query; the
+    view still authenticates the request as usual.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+
+    if raw_token is None:
+        return None
+
+    try:
+        return authentication.get_validated_token(raw_token).get(jwt_settings.USER_ID_CLAIM)
+    except InvalidToken:
+        return None
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """Serve safe requests on opted-in views from a replica.
+
+    A request that writes sets a short-lived cookie, and while it is
+    present the same client reads from the primary, so it always sees its
+    own writes despite replication lag. Clients authenticating with a
+    bearer token rarely keep cookies, so the same window is also kept in
+    the cache per user.
+    """
+
+    def handle(self, request):
+        state = RoutingState()
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        return self.mark_writes(request, response, state)
+
+    async def ahandle(self, request):
+        state = RoutingState()
+        token = _routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        return self.mark_writes(request, response, state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing.get()
+
+        if (
+            state is not None
+            and settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+            and view_reads_from_replica(view_func, request.method)
+            and not self.user_wrote_recently(request)
+        ):
+            state.alias = choose_replica()
+
+    def user_wrote_recently(self, request):
+        user_id = token_user_id(request)
+        return user_id is not None and cache.get(STICKY_USER_KEY.format(user_id)) is not None
+
+    def mark_writes(self, request, response, state):
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax"
+            )
+
+            user_id = token_user_id(request)
+            if user_id is not None:
+                cache.set(
+                    STICKY_USER_KEY.format(user_id), 1, settings.REPLICA_STICKY_SECONDS
+                )
+
+        return response
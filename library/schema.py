@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import cache
+from importlib import import_module
+
+import drf_spectacular
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def code_version():
+    """Identify the deployed code the schema was generated from.
+
+    CODE_VERSION (a git sha or image tag) wins. Without it the version is a
+    digest of the project's Python sources and the DRF and drf-spectacular
+    versions, which covers everything the schema is derived from.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+
+    digest = hashlib.sha1(
+        f"{rest_framework.__version__}|{drf_spectacular.__version__}".encode()
+    )
+    base_dir = str(settings.BASE_DIR)
+    roots = {
+        config.path for config in apps.get_app_configs()
+        if config.path.startswith(base_dir)
+    }
+    roots.add(os.path.dirname(import_module(settings.ROOT_URLCONF).__file__))
+
+    for root in sorted(roots):
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = sorted(name for name in subdirs if name != "__pycache__")
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    path = os.path.join(directory, name)
+                    digest.update(os.path.relpath(path, base_dir).encode())
+                    with open(path, "rb") as source:
+                        digest.update(source.read())
+
+    return digest.hexdigest()[:16]
+
+
+def generate_schema():
+    """Run the drf-spectacular generator and return the schema as JSON bytes."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+    return OpenApiJsonRenderer().render(schema, renderer_context={"indent": None})
+
+
+def write_schema(path, version, schema_json):
+    """Store the schema next to the version it belongs to, atomically."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as artifact:
+        artifact.write(version.encode() + b"\n" + schema_json)
+    os.replace(temporary, path)
+
+
+def read_schema(path, version):
+    """Return the stored schema if it was generated for this version."""
+    try:
+        with open(path, "rb") as artifact:
+            stored_version, _, schema_json = artifact.read().partition(b"\n")
+    except FileNotFoundError:
+        return None
+
+    if stored_version.decode() != version:
+        return None
+
+    return schema_json
+
+
+class SchemaCache:
+    """The OpenAPI schema of the running code, generated at most once.
+
+    Looks in memory, then in OPENAPI_SCHEMA_FILE (written at build time by
+    the generate_schema command), and only then runs the generator, saving
+    the result to the file for the other workers. Rendered bodies are kept
+    per media type together with their ETag.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._schema = None
+        self._rendered = {}
+
+    def get(self):
+        version = code_version()
+
+        with self._lock:
+            if self._version != version:
+                self._schema = self.load(version)
+                self._version = version
+                self._rendered = {}
+            return self._schema
+
+    def load(self, version):
+        path = settings.OPENAPI_SCHEMA_FILE
+        schema_json = read_schema(path, version)
+
+        if schema_json is None:
+            schema_json = generate_schema()
+            try:
+                write_schema(path, version, schema_json)
+            except OSError as error:
+                logger.warning("Could not save the OpenAPI schema to %s: %s", path, error)
+
+        return json.loads(schema_json)
+
+    def render(self, renderer, media_type):
+        """Return (body, etag) for the schema rendered by renderer."""
+        schema = self.get()
+        rendered = self._rendered.get(media_type)
+
+        if rendered is None:
+            body = renderer.render(schema, media_type, {})
+            etag = quote_etag(
+                f"{self._version}-{hashlib.sha1(body).hexdigest()[:16]}"
+            )
+            rendered = self._rendered[media_type] = (body, etag)
+
+        return rendered
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._schema = None
+            self._rendered = {}
+
+
+schema_cache = SchemaCache()
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """Serve the schema from schema_cache instead of regenerating it.
+
+    Clients that send the ETag back get a 304. Translated (?lang=) and
+    versioned requests are rare and still generated on the fly. The
+    Swagger and Redoc pages load their schema from this view.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("lang") or request.GET.get("version"):
+            return super().get(request, *args, **kwargs)
+
+        renderer, media_type = self.perform_content_negotiation(request)
+        body, etag = schema_cache.render(renderer, media_type)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(body, content_type=media_type)
+            response["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        return response
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+import sys
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -40,6 +42,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "drf_spectacular",
     "django_coverage_plugin",
@@ -62,26 +65,68 @@ COVERAGE_SHOW_MISSING = True
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
+        "user.authentication.ClaimsJWTAuthentication"
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
-    ]
+    ],
+    "DEFAULT_PAGINATION_CLASS": "library.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.environ.get("API_PAGE_SIZE", 50)),
+    # ORJSONRenderer only answers "application/json; engine=orjson" and
+    # ?format=orjson, the columnar MessagePack renderer only
+    # "application/msgpack; layout=columns" and ?format=msgpack-columns;
+    # plain JSON stays the default (see library.negotiation).
+    "DEFAULT_RENDERER_CLASSES": [
+        "rest_framework.renderers.JSONRenderer",
+        "library.renderers.ORJSONRenderer",
+        "library.renderers.MessagePackRenderer",
+        "library.renderers.ColumnarMessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "library.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS": "library.negotiation.ParameterContentNegotiation",
 }
 
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 500))
+
+# Book and borrowing lists are built from values() rows with compiled
+# field converters (library.fastlist). Set to false to serialize model
+# instances instead.
+FAST_LIST_SERIALIZATION = (
+    os.environ.get("FAST_LIST_SERIALIZATION", "true").lower() == "true"
+)
+
 SIMPLE_JWT = {
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
-    "ROTATE_REFRESH_TOKENS": True
+    "ROTATE_REFRESH_TOKENS": True,
+    "TOKEN_OBTAIN_SERIALIZER": "user.authentication.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.authentication.ClaimsTokenRefreshSerializer",
+    "TOKEN_USER_CLASS": "user.authentication.ClaimsUser",
 }
 
+# API requests authenticate from the token claims. With a non-zero TTL the
+# claims are also checked against a per-process copy of the user, so a
+# password or permission change locks old tokens out within that many
+# seconds; 0 trusts the claims until the access token expires.
+AUTH_USER_CACHE_TTL = int(os.environ.get("AUTH_USER_CACHE_TTL", 60))
+
 MIDDLEWARE = [
+    "library.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "library.profiling.ProfilingMiddleware",
+    "library.profiling.SlowQueryMiddleware",
+    "library.routers.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -117,9 +162,110 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "HOST": os.environ.get("POSTGRES_HOST"),
         "PORT": os.environ.get("POSTGRES_PORT"),
+        "OPTIONS": {},
     }
 }
 
+# Each process keeps a psycopg connection pool instead of connecting per
+# request. Requests wait up to DB_POOL_TIMEOUT seconds for a free
+# connection; idle connections above DB_POOL_MIN_SIZE are closed after
+# DB_POOL_MAX_IDLE seconds. DB_POOL=false turns pooling off.
+if os.environ.get("DB_POOL", "true").lower() == "true":
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+        "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+        "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+    }
+
+# Read replicas, e.g. POSTGRES_REPLICA_HOSTS=replica-1:5432,replica-2:5432.
+# Each copies the primary's settings with its own host and port. Safe
+# requests on views with read_from_replica pick one of them; writes, and
+# reads within REPLICA_STICKY_SECONDS of a client's last write, use the
+# primary.
+DATABASE_REPLICAS = []
+
+for number, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")), start=1
+):
+    host, _, port = address.strip().partition(":")
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+TESTING = sys.argv[1:2] == ["test"]
+
+# Under "manage.py test" without configured replicas, replica_1 mirrors the
+# test database on its own connection, so tests that enable it through
+# DATABASE_REPLICAS exercise the routing against a real second connection.
+if TESTING and not DATABASE_REPLICAS:
+    DATABASES["replica_1"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
+DATABASE_ROUTERS = ["library.routers.ReplicaRouter"]
+
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+
+# The book response cache, its versions and the per-user primary reads
+# window must be shared by every worker process. The process-local default
+# is only accepted with DEBUG or under tests (system check books.E001).
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "library"),
+    }
+}
+
+BOOK_CACHE_TIMEOUT = int(os.environ.get("BOOK_CACHE_TIMEOUT", 300))
+
+# Book change feed. Entries are only served once they are older than
+# BOOK_CHANGE_SETTLE_SECONDS, so a write that committed late is never
+# skipped, and "manage.py compact_book_changes" drops entries older than
+# BOOK_CHANGE_RETENTION_DAYS; clients with older tokens must resync.
+BOOK_CHANGE_SETTLE_SECONDS = int(os.environ.get("BOOK_CHANGE_SETTLE_SECONDS", 5))
+BOOK_CHANGE_RETENTION_DAYS = int(os.environ.get("BOOK_CHANGE_RETENTION_DAYS", 30))
+
+# The OpenAPI schema is generated once per code version: at build time by
+# "manage.py generate_schema", or by the first request otherwise. Set
+# CODE_VERSION (e.g. the git sha) in deployments; without it the version is
+# derived from the source files.
+CODE_VERSION = os.environ.get("CODE_VERSION", "")
+OPENAPI_SCHEMA_FILE = os.environ.get(
+    "OPENAPI_SCHEMA_FILE", os.path.join(BASE_DIR, "openapi-schema.json")
+)
+
+OVERDUE_CHECKPOINT_FILE = os.environ.get(
+    "OVERDUE_CHECKPOINT_FILE",
+    os.path.join(tempfile.gettempdir(), "overdue_reminders.json")
+)
+
+# /metrics is served to staff users and to scrapers sending
+# "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Opt-in diagnostics. With PROFILING_ENABLED, staff requests sent with the
+# X-Profile header or ?profile=1 are run under cProfile; queries slower than
+# SLOW_QUERY_MS (0 disables) are logged with their plan. Both directories
+# only keep the newest entries, so they are safe to leave on.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.environ.get(
+    "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "library-profiles")
+)
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 0))
+SLOW_QUERY_DIR = os.environ.get(
+    "SLOW_QUERY_DIR", os.path.join(tempfile.gettempdir(), "library-slow-queries")
+)
+SLOW_QUERY_KEEP = int(os.environ.get("SLOW_QUERY_KEEP", 200))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
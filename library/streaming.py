@@ -0,0 +1,66 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+STREAM_CHUNK_SIZE = 2000
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+class EchoBuffer:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, fieldnames):
+    writer = csv.DictWriter(EchoBuffer(), fieldnames=fieldnames)
+
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows, to_representation=None):
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+    for row in rows:
+        if to_representation is not None:
+            row = to_representation(row)
+        yield encoder.encode(row) + "\n"
+
+
+def buffered(lines, size=WRITE_BUFFER_SIZE):
+    """Join small lines into larger chunks to cut per-write overhead."""
+    buffer = []
+    buffered_size = 0
+
+    for line in lines:
+        buffer.append(line)
+        buffered_size += len(line)
+
+        if buffered_size >= size:
+            yield "".join(buffer)
+            buffer = []
+            buffered_size = 0
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def streaming_response(lines, content_type, filename=None):
+    response = StreamingHttpResponse(buffered(lines), content_type=content_type)
+
+    if filename:
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    return response
+
+
+def ndjson_response(lines, filename=None):
+    return streaming_response(lines, "application/x-ndjson", filename)
+
+
+def csv_response(lines, filename=None):
+    return streaming_response(lines, "text/csv", filename)
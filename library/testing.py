@@ -0,0 +1,24 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """Assert that an API call stays within a fixed number of SQL queries.
+
+    Mix into an APITestCase and seed enough rows that an N+1 pattern would
+    blow the budget, so regressions fail the test run.
+    """
+
+    def assertQueryBudget(self, budget, method, url, data=None, **extra):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data, **extra)
+
+        queries = "\n".join(query["sql"] for query in context.captured_queries)
+        self.assertLessEqual(
+            len(context),
+            budget,
+            f"{method.upper()} {url} ran {len(context)} queries "
+            f"(budget {budget}):\n{queries}"
+        )
+
+        return response
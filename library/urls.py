@@ -17,18 +17,17 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+
+from library.metrics import metrics_view
+from library.schema import CachedSpectacularAPIView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/library/", include("books.urls"), name="books"),
     path("api/user/", include("user.urls"), name="user"),
     path("api/borrowing/", include("borrowing.urls"), name="borrowing"),
-    path("api/doc/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/doc/", CachedSpectacularAPIView.as_view(), name="schema"),
     path(
         "api/doc/swagger/",
         SpectacularSwaggerView.as_view(url_name="schema"),
@@ -39,4 +38,5 @@ urlpatterns = [
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc"
     ),
+    path("metrics", metrics_view, name="metrics"),
 ]
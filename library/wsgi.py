@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "library.settings")
 
 application = get_wsgi_application()
+
+from django.core.signals import request_started  # noqa: E402
+
+from library.db import warm_pools_once  # noqa: E402
+
+request_started.connect(warm_pools_once)
@@ -1,23 +1,107 @@
 from telegram import Bot
+from telegram.error import RetryAfter, TelegramError
 import asyncio
+import time
 from dotenv import load_dotenv
 import os
 
+from library.metrics import TELEGRAM_LATENCY, TELEGRAM_SENDS
+
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
 
-bot = Bot(token=TELEGRAM_BOT_TOKEN)
+class TelegramSender:
+    """Send messages through one long-lived Bot session.
+
+    The sender owns its own event loop, so a synchronous worker can push
+    many batches without setting up a new loop and HTTP connection per
+    message. At most ``concurrency`` sends are in flight at once; with
+    ``rate_limit_retries`` a send that hits Telegram's flood control waits
+    the requested time and tries again instead of failing. Use it as a
+    context manager.
+    """
+
+    def __init__(self, bot=None, concurrency=8, rate_limit_retries=0):
+        self.bot = bot if bot is not None else Bot(token=TELEGRAM_BOT_TOKEN)
+        self.concurrency = concurrency
+        self.rate_limit_retries = rate_limit_retries
+        self.loop = asyncio.new_event_loop()
+
+    def __enter__(self):
+        self.loop.run_until_complete(self.bot.initialize())
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.loop.run_until_complete(self.bot.shutdown())
+        finally:
+            self.loop.close()
+
+    def send_many(self, messages):
+        """Send (chat_id, text) pairs; return None or the error for each."""
+        return self.loop.run_until_complete(self._send_many(messages))
+
+    async def _send_many(self, messages):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        return await asyncio.gather(
+            *(self._send(semaphore, chat_id, text) for chat_id, text in messages)
+        )
 
+    async def _send(self, semaphore, chat_id, text):
+        retries = self.rate_limit_retries
 
-async def send_message(text, chat_id):
-    async with bot:
-        await bot.send_message(text=text, chat_id=chat_id)
+        while True:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await self.bot.send_message(text=text, chat_id=chat_id)
+                    TELEGRAM_SENDS.labels("sent").inc()
+                    return None
+                except RetryAfter as error:
+                    TELEGRAM_SENDS.labels("rate_limited").inc()
+                    if retries <= 0:
+                        return error
+                    retries -= 1
+                    delay = error.retry_after
+                except TelegramError as error:
+                    TELEGRAM_SENDS.labels("error").inc()
+                    return error
+                finally:
+                    TELEGRAM_LATENCY.observe(time.perf_counter() - start)
+
+            await asyncio.sleep(int(delay))
+
+
+def borrowing_message(book, user_id):
+    return f"Book {book.title} was borrowed by visitor with ID: {user_id}"
 
 
 def notify_borrowing(book, user):
-    message = f"Book {book.title} was borrowed by visitor with ID: {user.id}"
+    """Queue a borrowing notification in the outbox.
+
+    The row is written in the caller's transaction and delivered later by
+    the ``send_notifications`` management command.
+    """
+    from borrowing.models import Notification
+
+    return Notification.objects.create(
+        chat_id=CHAT_ID or "",
+        text=borrowing_message(book, user.id)
+    )
+
+
+def notify_borrowings(borrowings):
+    """Queue notifications for many borrowings with a single insert."""
+    from borrowing.models import Notification
 
-    asyncio.run(send_message(message, CHAT_ID))
+    return Notification.objects.bulk_create(
+        Notification(
+            chat_id=CHAT_ID or "",
+            text=borrowing_message(borrowing.book_id, borrowing.user_id_id)
+        )
+        for borrowing in borrowings
+    )
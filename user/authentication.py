@@ -0,0 +1,171 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.crypto import salted_hmac
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+FINGERPRINT_CLAIM = "user_fp"
+USER_CACHE_MAX_SIZE = 10_000
+
+
+def user_fingerprint(user):
+    """Digest of everything the token claims depend on.
+
+    Changing the password, is_staff or is_active changes the fingerprint,
+    which is how outdated tokens are recognised.
+    """
+    value = f"{user.pk}|{user.password}|{user.is_staff}|{user.is_active}"
+    return salted_hmac("user.authentication", value).hexdigest()[:20]
+
+
+def add_claims(token, user):
+    token["is_staff"] = user.is_staff
+    token["is_active"] = user.is_active
+    token[FINGERPRINT_CLAIM] = user_fingerprint(user)
+    return token
+
+
+class UserStateCache:
+    """Short-lived per-process cache of (is_active, fingerprint) per user.
+
+    Entries expire after AUTH_USER_CACHE_TTL seconds and are dropped as
+    soon as the user is saved in this process (see user.signals).
+    """
+
+    def __init__(self, max_size=USER_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, ttl):
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        user = (
+            get_user_model().objects
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .only("pk", "password", "is_staff", "is_active")
+            .first()
+        )
+        state = None if user is None else (user.is_active, user_fingerprint(user))
+
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries = {
+                    key: value for key, value in self._entries.items()
+                    if value[0] > now
+                }
+                if len(self._entries) >= self.max_size:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[user_id] = (now + ttl, state)
+
+        return state
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_states = UserStateCache()
+
+
+class ClaimsUser(TokenUser):
+    """Request user built from the token claims, with no database row.
+
+    Carries id, is_staff and is_active, which is all the API views and
+    permissions need. Views that edit the user itself must keep using
+    JWTAuthentication to get a real User instance.
+    """
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", False)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts signed claims instead of a user query.
+
+    With AUTH_USER_CACHE_TTL set, the token fingerprint is also checked
+    against a cached copy of the user, so a changed password, is_staff or
+    is_active locks the old tokens out within the TTL at the cost of one
+    query per user per TTL. Tokens issued before the claims existed fall
+    back to the regular user lookup.
+    """
+
+    def get_user(self, validated_token):
+        if FINGERPRINT_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        ttl = settings.AUTH_USER_CACHE_TTL
+
+        if ttl:
+            state = user_states.get(validated_token[api_settings.USER_ID_CLAIM], ttl)
+            if state is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            is_active, fingerprint = state
+            if fingerprint != validated_token[FINGERPRINT_CLAIM]:
+                raise AuthenticationFailed(
+                    _("The user's account has changed, log in again."),
+                    code="token_outdated"
+                )
+        else:
+            is_active = validated_token.get("is_active", False)
+
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """Document ClaimsJWTAuthentication as the regular bearer JWT scheme."""
+
+    target_class = ClaimsJWTAuthentication
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuse to refresh tokens whose claims no longer match the user.
+
+    Access tokens copy their claims from the refresh token, so without this
+    check a demoted or deactivated user would keep their old claims for
+    the whole refresh token lifetime.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        if FINGERPRINT_CLAIM in refresh:
+            user = (
+                get_user_model().objects
+                .filter(**{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]})
+                .first()
+            )
+            if user is None or user_fingerprint(user) != refresh[FINGERPRINT_CLAIM]:
+                raise TokenError(_("The user's account has changed, log in again."))
+
+        return super().validate(attrs)
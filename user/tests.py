@@ -1,3 +1,114 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from library.testing import QueryBudgetMixin
+from user.authentication import FINGERPRINT_CLAIM, user_states
+
+
+class UserQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+
+    def test_register_query_budget(self):
+        data = {"email": "new@example.com", "password": "password"}
+        response = self.assertQueryBudget(2, "post", reverse("user:create"), data)
+        self.assertEqual(response.status_code, 201)
+
+    def test_manage_user_query_budget(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.assertQueryBudget(0, "get", reverse("user:manage"))
+        self.assertEqual(response.data["email"], "user@example.com")
+
+
+class ClaimsAuthenticationTest(APITestCase):
+    def setUp(self):
+        user_states.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="password")
+        self.staff = get_user_model().objects.create_user(email="staff@example.com", password="password", is_staff=True)
+        self.borrowing_url = reverse("borrowing:borrowing-list")
+
+    def obtain(self, email):
+        response = self.client.post(reverse("user:token_obtain_pair"), {"email": email, "password": "password"})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def get(self, url, access):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_AUTHORIZE=f"Bearer {access}")
+        user_queries = [query for query in context.captured_queries if '"user_user"' in query["sql"]]
+        return response, user_queries
+
+    def test_token_carries_claims(self):
+        access = AccessToken(self.obtain("staff@example.com")["access"])
+
+        self.assertTrue(access["is_staff"])
+        self.assertTrue(access["is_active"])
+        self.assertIn(FINGERPRINT_CLAIM, access)
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_claims_replace_user_query(self):
+        response, user_queries = self.get(self.borrowing_url, self.obtain("user@example.com")["access"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(user_queries, [])
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_inactive_claim_is_rejected(self):
+        access = AccessToken.for_user(self.user)
+        access["is_active"] = False
+        access[FINGERPRINT_CLAIM] = "stale"
+
+        response, _ = self.get(self.borrowing_url, access)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_user_cache_loads_user_once(self):
+        access = self.obtain("user@example.com")["access"]
+
+        _, first = self.get(self.borrowing_url, access)
+        response, second = self.get(self.borrowing_url, access)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(second, [])
+
+    def test_permission_change_locks_out_old_tokens(self):
+        access = self.obtain("staff@example.com")["access"]
+        self.assertEqual(self.get(self.borrowing_url, access)[0].status_code, 200)
+
+        self.staff.is_staff = False
+        self.staff.save()
+
+        response, _ = self.get(self.borrowing_url, access)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["code"], "token_outdated")
+
+    def test_refresh_keeps_claims(self):
+        refresh = self.obtain("staff@example.com")["refresh"]
+
+        response = self.client.post(reverse("user:token_refresh"), {"refresh": refresh})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AccessToken(response.data["access"])["is_staff"])
+
+    def test_password_change_blocks_refresh(self):
+        refresh = self.obtain("user@example.com")["refresh"]
+        self.user.set_password("new-password")
+        self.user.save()
+
+        response = self.client.post(reverse("user:token_refresh"), {"refresh": refresh})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_manage_user_loads_full_user(self):
+        response, user_queries = self.get(reverse("user:manage"), self.obtain("user@example.com")["access"])
+
+        self.assertEqual(response.data["email"], "user@example.com")
+        self.assertEqual(len(user_queries), 1)